@@ -15,6 +15,7 @@ from pathlib import Path
 
 from app.config import get_settings
 from app.db.database import init_db
+from app.services.ollama import close_shared_client
 
 
 settings = get_settings()
@@ -37,6 +38,7 @@ async def lifespan(app: FastAPI) -> AsyncGenerator:
     
     # Shutdown
     print("Shutting down...")
+    await close_shared_client()
 
 
 def create_app() -> FastAPI:
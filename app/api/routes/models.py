@@ -16,10 +16,14 @@ settings = get_settings()
 
 
 @router.get("/")
-async def get_models():
+async def get_models(detailed: bool = False, refresh: bool = False):
     """
     List all available Ollama models.
     
+    Args:
+        detailed: Also fetch per-model details (e.g. context length)
+        refresh: Bypass the cached model list (e.g. right after a pull)
+    
     Returns:
         List of model information including name, size, and capabilities.
     """
@@ -31,7 +35,11 @@ async def get_models():
             detail=f"Ollama not connected: {status.get('message')}"
         )
     
-    models = await list_available_models()
+    if detailed:
+        async with OllamaClient() as client:
+            models = await client.list_models_detailed(refresh=refresh)
+    else:
+        models = await list_available_models(refresh=refresh)
     
     # Categorize models
     analysis_models = []
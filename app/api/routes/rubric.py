@@ -2,7 +2,8 @@
 Rubric management endpoints.
 """
 
-from fastapi import APIRouter, HTTPException
+import orjson
+from fastapi import APIRouter, HTTPException, Response
 from pathlib import Path
 
 from app.services.rubric import (
@@ -28,21 +29,27 @@ async def get_rubric():
     if rubric_path.exists():
         try:
             rubric = load_rubric_from_markdown(rubric_path)
-            return {
-                "source": "file",
-                "path": str(rubric_path),
-                "rubric": rubric.to_dict(),
-            }
+            return _rubric_response(
+                {"source": "file", "path": str(rubric_path)}, rubric
+            )
         except Exception as e:
             # Fall back to default if parsing fails
             pass
     
     # Use programmatic default
     rubric = create_default_rubric()
-    return {
-        "source": "default",
-        "rubric": rubric.to_dict(),
-    }
+    return _rubric_response({"source": "default"}, rubric)
+
+
+def _rubric_response(fields: dict, rubric: RubricData) -> Response:
+    """
+    JSON response of fields plus a "rubric" key.
+    
+    The rubric's cached JSON bytes are spliced in as-is instead of being
+    rebuilt as a dict and re-encoded on every request.
+    """
+    body = orjson.dumps(fields)[:-1] + b',"rubric":' + rubric.to_json_bytes() + b"}"
+    return Response(content=body, media_type="application/json")
 
 
 @router.get("/default")
@@ -54,7 +61,7 @@ async def get_default_rubric():
     for reliability.
     """
     rubric = create_default_rubric()
-    return rubric.to_dict()
+    return Response(content=rubric.to_json_bytes(), media_type="application/json")
 
 
 @router.get("/summary")
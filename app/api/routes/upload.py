@@ -3,6 +3,7 @@ File upload endpoints.
 """
 
 from fastapi import APIRouter, File, UploadFile, HTTPException, Form
+from fastapi.concurrency import run_in_threadpool
 from typing import Optional
 
 from app.config import get_settings
@@ -48,7 +49,8 @@ async def upload_essay(
         )
     
     try:
-        parsed = parse_essay(content, filename)
+        # DOCX/PDF extraction is CPU-bound; keep it off the event loop
+        parsed = await run_in_threadpool(parse_essay, content, filename)
         return {
             "success": True,
             "filename": filename,
@@ -145,7 +147,7 @@ async def preview_submission(
     # Parse essay
     essay_content = await essay.read()
     try:
-        parsed_essay = parse_essay(essay_content, essay.filename)
+        parsed_essay = await run_in_threadpool(parse_essay, essay_content, essay.filename)
     except Exception as e:
         raise HTTPException(
             status_code=422,
@@ -5,7 +5,7 @@ Loads from environment variables and .env file.
 
 from functools import lru_cache
 from pathlib import Path
-from typing import Literal
+from typing import Literal, Optional
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -30,6 +30,7 @@ class Settings(BaseSettings):
     host: str = "0.0.0.0"  # Allow remote connections
     port: int = 8000
     reload: bool = True
+    workers: int = 1  # Worker processes when reload is off (SQLite is not multi-process safe)
     
     # Database
     database_url: str = "sqlite+aiosqlite:///./data/process_analyzer.db"
@@ -40,11 +41,23 @@ class Settings(BaseSettings):
     default_embedding_model: str = "bge-m3"
     fallback_analysis_model: str = "ministral:latest"
     fallback_embedding_model: str = "nomic-embed-text"
+    ollama_embed_batch_size: int = 64  # Texts per /api/embed request
+    ollama_max_concurrent_embed_batches: int = 4  # In-flight embed requests
+    ollama_fused_max_ctx: int = 32768  # Largest context (tokens) a fused assessment may request
+    ollama_max_concurrent_generations: int = 1  # In-flight analysis generations (raise to match OLLAMA_NUM_PARALLEL)
+    ollama_http2: bool = False  # Multiplex requests over HTTP/2 (needs h2 and an https endpoint)
+    ollama_keep_alive: str = "5m"  # How long Ollama keeps a model loaded ("-1" = forever)
+    ollama_warmup_on_connect: bool = True  # Preload default models after a connection check
+    ollama_models_cache_ttl: float = 30.0  # Seconds to reuse the model list
+    embedding_cache_enabled: bool = True  # Memoize embeddings on disk
+    embedding_cache_path: str = "./data/embedding_cache.sqlite"
+    embedding_cache_memory_size: int = 10000  # Vectors also kept in an in-process LRU
     
     # RAG
     chroma_persist_dir: str = "./data/chroma"
     chunk_overlap: int = 1
     max_retrieval_chunks: int = 5
+    rag_query_cache_threshold: Optional[float] = None  # Reuse results for queries this cosine-similar (None = off)
     
     # Assessment
     assessment_passes: int = 1
@@ -5,6 +5,7 @@ from app.services.assessment.prompts import (
     create_criterion_prompt,
     create_summary_prompt,
     create_authenticity_prompt,
+    AUTHENTICITY_SCHEMA,
 )
 from app.services.assessment.analyzer import (
     AssessmentEngine,
@@ -18,6 +19,7 @@ __all__ = [
     "create_criterion_prompt",
     "create_summary_prompt",
     "create_authenticity_prompt",
+    "AUTHENTICITY_SCHEMA",
     "AssessmentEngine",
     "CriterionAssessment",
     "FullAssessment",
@@ -8,6 +8,7 @@ The main engine that orchestrates the full assessment process:
 4. Run authenticity checks
 """
 
+import asyncio
 import json
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
@@ -27,11 +28,56 @@ from app.services.assessment.prompts import (
     create_criterion_prompt,
     create_summary_prompt,
     create_authenticity_prompt,
+    AUTHENTICITY_SCHEMA,
+    create_fused_prompt,
+    create_fused_schema,
     create_query_for_criterion,
 )
 
 settings = get_settings()
 
+# Fused prompt sizing. English averages about four characters per token;
+# 3.5 leaves headroom for markup, names and numbers.
+_CHARS_PER_TOKEN = 3.5
+_FUSED_RESPONSE_TOKENS_PER_ITEM = 400  # Per criterion, plus one for authenticity
+_NUM_CTX_STEP = 2048
+
+
+class _FusedPromptTooLarge(Exception):
+    """The fused prompt would not fit in settings.ollama_fused_max_ctx."""
+
+
+# Process-wide cap on in-flight analysis generations, shared by every
+# assessment so concurrent requests cannot pile up in Ollama's queue
+_generation_slots: Optional[asyncio.Semaphore] = None
+_generation_slots_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _get_generation_slots() -> asyncio.Semaphore:
+    """
+    Get the shared generation semaphore for the running event loop.
+    
+    Sized by settings.ollama_max_concurrent_generations. Like the shared
+    Ollama client, it is created lazily and rebuilt if the loop changes.
+    
+    Returns:
+        The shared asyncio.Semaphore
+    """
+    global _generation_slots, _generation_slots_loop
+    
+    loop = asyncio.get_running_loop()
+    if _generation_slots is None or _generation_slots_loop is not loop:
+        _generation_slots = asyncio.Semaphore(max(1, settings.ollama_max_concurrent_generations))
+        _generation_slots_loop = loop
+    
+    return _generation_slots
+
+
+def _fused_num_ctx(prompt_chars: int, item_count: int) -> int:
+    """Context window (rounded up to _NUM_CTX_STEP) for a fused prompt and its reply."""
+    tokens = prompt_chars / _CHARS_PER_TOKEN + item_count * _FUSED_RESPONSE_TOKENS_PER_ITEM
+    return -(-int(tokens) // _NUM_CTX_STEP) * _NUM_CTX_STEP
+
 
 @dataclass
 class Evidence:
@@ -50,6 +96,17 @@ class Evidence:
             "excerpt": self.excerpt,
             "analysis": self.analysis,
         }
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> "Evidence":
+        """Create from dictionary."""
+        return cls(
+            type=data.get("type", ""),
+            reference=data.get("reference", ""),
+            citation=data.get("citation", ""),
+            excerpt=data.get("excerpt", ""),
+            analysis=data.get("analysis", ""),
+        )
 
 
 @dataclass
@@ -77,6 +134,21 @@ class CriterionAssessment:
             "feedback": self.feedback,
             "confidence": self.confidence,
         }
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> "CriterionAssessment":
+        """Create from dictionary."""
+        return cls(
+            criterion_name=data.get("criterion_name", ""),
+            criterion_id=data.get("criterion_id", ""),
+            points_possible=data.get("points_possible", 0),
+            points_earned=data.get("points_earned", 0),
+            level=data.get("level", "inadequate"),
+            reasoning=data.get("reasoning", ""),
+            evidence=[Evidence.from_dict(e) for e in data.get("evidence", [])],
+            feedback=data.get("feedback", ""),
+            confidence=data.get("confidence", "low"),
+        )
 
 
 @dataclass
@@ -96,6 +168,17 @@ class AuthenticityResult:
             "positive_indicators": self.positive_indicators,
             "overall_assessment": self.overall_assessment,
         }
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> "AuthenticityResult":
+        """Create from dictionary."""
+        return cls(
+            score=data.get("score", 0),
+            confidence=data.get("confidence", "low"),
+            flags=data.get("flags", []),
+            positive_indicators=data.get("positive_indicators", []),
+            overall_assessment=data.get("overall_assessment", ""),
+        )
 
 
 @dataclass  
@@ -146,6 +229,32 @@ class FullAssessment:
             "processing_time_seconds": self.processing_time_seconds,
             "errors": self.errors,
         }
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> "FullAssessment":
+        """Create from the dictionary produced by to_dict."""
+        summary = data.get("summary", {})
+        authenticity = data.get("authenticity")
+        return cls(
+            submission_id=data.get("submission_id"),
+            model_name=data.get("model_name", ""),
+            timestamp=data.get("timestamp", ""),
+            criterion_assessments=[
+                CriterionAssessment.from_dict(ca)
+                for ca in data.get("criterion_assessments", [])
+            ],
+            total_score=data.get("total_score", 0),
+            total_possible=data.get("total_possible", 0),
+            summary_paragraphs=summary.get("paragraphs", []),
+            key_strengths=summary.get("key_strengths", []),
+            areas_for_growth=summary.get("areas_for_growth", []),
+            notable_observations=summary.get("notable_observations", ""),
+            overall_quality=summary.get("overall_quality", ""),
+            recommended_grade=summary.get("recommended_grade", ""),
+            authenticity=AuthenticityResult.from_dict(authenticity) if authenticity else None,
+            processing_time_seconds=data.get("processing_time_seconds", 0.0),
+            errors=data.get("errors", []),
+        )
 
 
 class AssessmentEngine:
@@ -164,12 +273,14 @@ class AssessmentEngine:
         embedding_model: Optional[str] = None,
         retrieval_top_k: int = 5,
         authenticity_mode: str = "conservative",
+        fused: bool = False,
     ):
         self.rubric = rubric
         self.model = model or settings.default_analysis_model
         self.embedding_model = embedding_model or settings.default_embedding_model
         self.retrieval_top_k = retrieval_top_k
         self.authenticity_mode = authenticity_mode
+        self.fused = fused
         
         self._chunks: list[ChatChunk] = []
         self._retriever: Optional[Retriever] = None
@@ -219,42 +330,75 @@ class AssessmentEngine:
                 model=self.embedding_model,
                 show_progress=False
             )
-            self._retriever = Retriever(embedding_model=self.embedding_model)
+            self._retriever = Retriever(
+                embedding_model=self.embedding_model,
+                query_cache_threshold=settings.rag_query_cache_threshold,
+            )
             self._retriever.add_chunks(self._chunks)
         except Exception as e:
             errors.append(f"Embedding failed: {str(e)}")
             # Continue with empty retriever
             self._retriever = Retriever()
         
+        # Every analysis generation below (criteria, summary, authenticity)
+        # takes a process-wide slot, so no more than the configured number are
+        # in flight across all assessments and none waits in Ollama's queue
+        # against its request timeout
+        generation_slots = _get_generation_slots()
+        
         # Step 2: Assess each criterion
+        criteria = [c for category in self.rubric.categories for c in category.criteria]
         criterion_assessments = []
+        authenticity_result = None
+        fused = self.fused
         
-        for category in self.rubric.categories:
-            for criterion in category.criteria:
-                report_progress(f"Assessing: {criterion.name}", current_step, total_steps)
-                current_step += 1
-                
-                try:
-                    assessment = await self._assess_criterion(
-                        criterion=criterion,
-                        essay_text=essay.text,
-                        assignment_context=assignment_context,
-                    )
-                    criterion_assessments.append(assessment)
-                except Exception as e:
-                    errors.append(f"Criterion '{criterion.name}' failed: {str(e)}")
-                    # Create a placeholder with 0 score
-                    criterion_assessments.append(CriterionAssessment(
-                        criterion_name=criterion.name,
-                        criterion_id=f"err_{criterion.name}",
-                        points_possible=criterion.points,
-                        points_earned=0,
-                        level="inadequate",
-                        reasoning=f"Assessment failed: {str(e)}",
-                        evidence=[],
-                        feedback="Unable to assess this criterion due to an error.",
-                        confidence="low",
-                    ))
+        if fused:
+            # One generation scores every criterion (and authenticity)
+            report_progress("Assessing all criteria in one pass", current_step, total_steps)
+            
+            try:
+                criterion_assessments, authenticity_result, fused_errors = await self._assess_fused(
+                    criteria=criteria,
+                    chat_history=chat_history,
+                    essay_text=essay.text,
+                    assignment_context=assignment_context,
+                    run_authenticity=run_authenticity,
+                )
+                errors.extend(fused_errors)
+                current_step += len(criteria)
+            except _FusedPromptTooLarge as e:
+                # Too big for one context window; score criteria separately
+                print(f"  {e}; assessing criteria one at a time")
+                fused = False
+            except Exception as e:
+                errors.append(f"Fused assessment failed: {str(e)}")
+                criterion_assessments = [self._failed_assessment(c, e) for c in criteria]
+                current_step += len(criteria)
+        
+        if not fused:
+            # Criteria are independent, so several are assessed at once;
+            # results and errors are still collected in rubric order
+            async def assess_one(criterion: CriterionData) -> tuple[CriterionAssessment, Optional[str]]:
+                nonlocal current_step
+                async with generation_slots:
+                    report_progress(f"Assessing: {criterion.name}", current_step, total_steps)
+                    current_step += 1
+                    
+                    try:
+                        assessment = await self._assess_criterion(
+                            criterion=criterion,
+                            essay_text=essay.text,
+                            assignment_context=assignment_context,
+                        )
+                        return assessment, None
+                    except Exception as e:
+                        error = f"Criterion '{criterion.name}' failed: {str(e)}"
+                        return self._failed_assessment(criterion, e), error
+            
+            for assessment, error in await asyncio.gather(*(assess_one(c) for c in criteria)):
+                criterion_assessments.append(assessment)
+                if error:
+                    errors.append(error)
         
         # Calculate totals
         total_score = sum(ca.points_earned for ca in criterion_assessments)
@@ -264,27 +408,39 @@ class AssessmentEngine:
         report_progress("Generating summary assessment", current_step, total_steps)
         current_step += 1
         
-        summary_result = await self._generate_summary(
-            criterion_assessments=criterion_assessments,
-            total_score=total_score,
-            total_possible=total_possible,
-            essay_preview=essay.text,
-            assignment_context=assignment_context,
-        )
+        async def generate_summary() -> dict:
+            async with generation_slots:
+                return await self._generate_summary(
+                    criterion_assessments=criterion_assessments,
+                    total_score=total_score,
+                    total_possible=total_possible,
+                    essay_preview=essay.text,
+                    assignment_context=assignment_context,
+                )
         
-        # Step 4: Authenticity check
-        authenticity_result = None
-        if run_authenticity:
+        # Step 4: Authenticity check (already done by a fused pass). It does
+        # not depend on the summary, so the two generations overlap when
+        # more than one slot is configured (summary first otherwise).
+        if run_authenticity and authenticity_result is None:
             report_progress("Running authenticity analysis", current_step, total_steps)
             current_step += 1
             
-            try:
-                authenticity_result = await self._check_authenticity(
-                    chat_history=chat_history,
-                    essay_text=essay.text,
-                )
-            except Exception as e:
-                errors.append(f"Authenticity check failed: {str(e)}")
+            async def check_authenticity() -> Optional[AuthenticityResult]:
+                async with generation_slots:
+                    try:
+                        return await self._check_authenticity(
+                            chat_history=chat_history,
+                            essay_text=essay.text,
+                        )
+                    except Exception as e:
+                        errors.append(f"Authenticity check failed: {str(e)}")
+                        return None
+            
+            summary_result, authenticity_result = await asyncio.gather(
+                generate_summary(), check_authenticity()
+            )
+        else:
+            summary_result = await generate_summary()
         
         # Calculate processing time
         end_time = datetime.now(timezone.utc)
@@ -315,19 +471,7 @@ class AssessmentEngine:
         assignment_context: Optional[str],
     ) -> CriterionAssessment:
         """Assess a single criterion."""
-        # Generate search query for this criterion
-        query = create_query_for_criterion(criterion.name)
-        
-        # Retrieve relevant chunks
-        if self._retriever:
-            results = await self._retriever.search(
-                query=query,
-                top_k=self.retrieval_top_k,
-                min_score=0.25,
-            )
-            retrieved_text = format_retrieved_for_prompt(results)
-        else:
-            retrieved_text = "No chat history available."
+        retrieved_text = await self._retrieve_for_criterion(criterion)
         
         # Create prompt
         prompt = create_criterion_prompt(
@@ -350,7 +494,25 @@ class AssessmentEngine:
         response_text = response.get("response", "{}")
         result = self._parse_json_response(response_text)
         
-        # Build assessment
+        return self._build_criterion_assessment(criterion, result)
+    
+    async def _retrieve_for_criterion(self, criterion: CriterionData) -> str:
+        """Retrieve and format the chat excerpts relevant to a criterion."""
+        # Generate search query for this criterion
+        query = create_query_for_criterion(criterion.name)
+        
+        # Retrieve relevant chunks
+        if self._retriever:
+            results = await self._retriever.search(
+                query=query,
+                top_k=self.retrieval_top_k,
+                min_score=0.25,
+            )
+            return format_retrieved_for_prompt(results)
+        return "No chat history available."
+    
+    def _build_criterion_assessment(self, criterion: CriterionData, result: dict) -> CriterionAssessment:
+        """Build a CriterionAssessment from the model's JSON result."""
         evidence = []
         for ev in result.get("evidence", []):
             evidence.append(Evidence(
@@ -410,6 +572,30 @@ class AssessmentEngine:
         essay_text: str,
     ) -> AuthenticityResult:
         """Run authenticity checks."""
+        stats, chat_excerpts = self._authenticity_inputs(chat_history)
+        
+        prompt = create_authenticity_prompt(
+            chat_history_stats=stats,
+            chat_excerpts=chat_excerpts,
+            essay_text=essay_text,
+            mode=self.authenticity_mode,
+        )
+        
+        async with OllamaClient(timeout=120.0) as client:
+            response = await client.generate(
+                prompt=prompt,
+                model=self.model,
+                system=SYSTEM_PROMPT,
+                format=AUTHENTICITY_SCHEMA,
+            )
+        
+        response_text = response.get("response", "{}")
+        result = self._parse_json_response(response_text)
+        
+        return self._build_authenticity_result(result)
+    
+    def _authenticity_inputs(self, chat_history: ParsedChatHistory) -> tuple[dict, str]:
+        """Compute chat statistics and sample excerpts for the authenticity check."""
         # Calculate stats
         stats = {
             "total_exchanges": chat_history.total_exchanges,
@@ -419,10 +605,10 @@ class AssessmentEngine:
         }
         
         if chat_history.exchanges:
-            prompts = [ex.student_prompt for ex in chat_history.exchanges]
-            responses = [ex.ai_response for ex in chat_history.exchanges]
-            stats["avg_prompt_length"] = sum(len(p) for p in prompts) // len(prompts)
-            stats["avg_response_length"] = sum(len(r) for r in responses) // len(responses)
+            columns = chat_history.to_columns()
+            count = len(columns.numbers)
+            stats["avg_prompt_length"] = sum(map(len, columns.student_prompts)) // count
+            stats["avg_response_length"] = sum(map(len, columns.ai_responses)) // count
         
         # Sample chat excerpts (first 3, middle 2, last 2)
         excerpts = []
@@ -444,32 +630,111 @@ Student: {ex.student_prompt[:300]}{"..." if len(ex.student_prompt) > 300 else ""
 AI: {ex.ai_response[:300]}{"..." if len(ex.ai_response) > 300 else ""}
 """)
         
-        chat_excerpts = "\n".join(excerpts)
+        return stats, "\n".join(excerpts)
+    
+    def _build_authenticity_result(self, result: dict) -> AuthenticityResult:
+        """Build an AuthenticityResult from the model's JSON result."""
+        return AuthenticityResult(
+            score=result.get("authenticity_score", 50),
+            confidence=result.get("confidence", "low"),
+            flags=result.get("flags", []),
+            positive_indicators=result.get("positive_indicators", []),
+            overall_assessment=result.get("overall_assessment", "Unable to assess"),
+        )
+    
+    async def _assess_fused(
+        self,
+        criteria: list[CriterionData],
+        chat_history: ParsedChatHistory,
+        essay_text: str,
+        assignment_context: Optional[str],
+        run_authenticity: bool,
+    ) -> tuple[list[CriterionAssessment], Optional[AuthenticityResult], list[str]]:
+        """
+        Score every criterion (and optionally authenticity) with one
+        schema-constrained generation, so the essay is processed once.
+        
+        Returns:
+            Criterion assessments in order, the authenticity result (None when
+            not requested or missing from the reply, so the caller can run it
+            separately), and errors for criteria the reply did not cover
+        """
+        retrieved = [await self._retrieve_for_criterion(c) for c in criteria]
         
-        prompt = create_authenticity_prompt(
+        stats, chat_excerpts = (
+            self._authenticity_inputs(chat_history) if run_authenticity else (None, None)
+        )
+        
+        prompt = create_fused_prompt(
+            criteria=list(zip(criteria, retrieved)),
+            essay_text=essay_text,
+            assignment_context=assignment_context,
             chat_history_stats=stats,
             chat_excerpts=chat_excerpts,
-            essay_text=essay_text,
             mode=self.authenticity_mode,
         )
         
-        async with OllamaClient(timeout=120.0) as client:
+        # Ollama silently drops the start of a prompt that overflows num_ctx
+        # (the essay and first criteria), so size the context to the prompt
+        num_ctx = _fused_num_ctx(
+            len(SYSTEM_PROMPT) + len(prompt),
+            len(criteria) + (1 if run_authenticity else 0),
+        )
+        if num_ctx > settings.ollama_fused_max_ctx:
+            raise _FusedPromptTooLarge(
+                f"Fused prompt needs about {num_ctx} tokens of context, "
+                f"above OLLAMA_FUSED_MAX_CTX={settings.ollama_fused_max_ctx}"
+            )
+        
+        # The single response covers every criterion, so allow proportionally longer
+        async with _get_generation_slots(), OllamaClient(timeout=120.0 * (len(criteria) + 1)) as client:
             response = await client.generate(
                 prompt=prompt,
                 model=self.model,
                 system=SYSTEM_PROMPT,
-                format="json",
+                format=create_fused_schema(criteria, include_authenticity=run_authenticity),
+                options={"num_ctx": num_ctx},
             )
         
-        response_text = response.get("response", "{}")
-        result = self._parse_json_response(response_text)
+        result = self._parse_json_response(response.get("response", "{}"))
+        if not isinstance(result, dict) or not result:
+            raise ValueError("Fused response was empty or not valid JSON")
+        criterion_results = result.get("criteria")
+        if not isinstance(criterion_results, dict):
+            criterion_results = {}
         
-        return AuthenticityResult(
-            score=result.get("authenticity_score", 50),
-            confidence=result.get("confidence", "low"),
-            flags=result.get("flags", []),
-            positive_indicators=result.get("positive_indicators", []),
-            overall_assessment=result.get("overall_assessment", "Unable to assess"),
+        # A truncated reply can stop partway through; criteria it never
+        # reached are failures, not zero-point assessments
+        assessments = []
+        errors = []
+        for c in criteria:
+            criterion_result = criterion_results.get(c.name)
+            if isinstance(criterion_result, dict) and criterion_result:
+                assessments.append(self._build_criterion_assessment(c, criterion_result))
+            else:
+                error = ValueError("missing from fused response")
+                assessments.append(self._failed_assessment(c, error))
+                errors.append(f"Criterion '{c.name}' failed: {str(error)}")
+        
+        authenticity = None
+        if run_authenticity:
+            authenticity_result = result.get("authenticity")
+            if isinstance(authenticity_result, dict) and authenticity_result:
+                authenticity = self._build_authenticity_result(authenticity_result)
+        return assessments, authenticity, errors
+    
+    def _failed_assessment(self, criterion: CriterionData, error: Exception) -> CriterionAssessment:
+        """Placeholder with 0 score for a criterion that could not be assessed."""
+        return CriterionAssessment(
+            criterion_name=criterion.name,
+            criterion_id=f"err_{criterion.name}",
+            points_possible=criterion.points,
+            points_earned=0,
+            level="inadequate",
+            reasoning=f"Assessment failed: {str(error)}",
+            evidence=[],
+            feedback="Unable to assess this criterion due to an error.",
+            confidence="low",
         )
     
     def _parse_json_response(self, text: str) -> dict:
@@ -510,6 +775,7 @@ async def assess_submission(
     run_authenticity: bool = True,
     authenticity_mode: str = "conservative",
     progress_callback: Optional[Callable[[str, int, int], None]] = None,
+    fused: bool = False,
 ) -> FullAssessment:
     """
     Convenience function to assess a submission.
@@ -523,6 +789,7 @@ async def assess_submission(
         run_authenticity: Whether to run authenticity checks
         authenticity_mode: "conservative" or "aggressive"
         progress_callback: Optional progress callback
+        fused: Score all criteria (and authenticity) in a single generation
         
     Returns:
         FullAssessment with complete results
@@ -531,6 +798,7 @@ async def assess_submission(
         rubric=rubric,
         model=model,
         authenticity_mode=authenticity_mode,
+        fused=fused,
     )
     
     return await engine.assess(
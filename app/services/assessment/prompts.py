@@ -9,6 +9,8 @@ These prompts are designed to:
 4. Provide constructive feedback
 """
 
+from functools import lru_cache
+from types import MappingProxyType
 from typing import Optional
 from app.services.rubric.loader import CriterionData, LevelData
 
@@ -74,6 +76,35 @@ You must respond in valid JSON format as specified in each task."""
 # CRITERION ASSESSMENT PROMPT
 # =============================================================================
 
+# Shared by the per-criterion and fused prompts
+_SCORING_GUIDANCE = """SCORING GUIDANCE - READ CAREFULLY:
+
+INADEQUATE (0-49% of points): The student shows one or more of these patterns:
+- Delegating thinking to AI ("give me a paragraph", "write this for me", "pick for me")
+- No original position or thesis stated before asking AI for help
+- Accepting AI output without any critical evaluation or modification
+- Simple factual queries with no depth ("what is X?")
+- No pushback, disagreement, or challenging of AI responses
+
+DEVELOPING (50-69% of points): The student shows:
+- Some direction given to AI, but still mostly passive
+- Occasional questions but no sustained engagement
+- Format-focused requests ("make it shorter") without substantive critique
+- May state a position but doesn't defend or develop it independently
+
+PROFICIENT (70-89% of points): The student demonstrates:
+- Clear original thinking BEFORE using AI as a tool
+- Meaningful pushback or questioning of AI responses (at least 2-3 instances)
+- Synthesis of information rather than copy-paste
+- Some evidence of intellectual struggle and growth
+
+EXEMPLARY (90-100% of points): The student demonstrates:
+- Strong original position articulated first, AI used to stress-test it
+- Multiple instances of disagreement, critique, or catching AI limitations
+- Clear evidence that the final work is the STUDENT'S, enhanced by AI
+- Sophisticated synthesis and intellectual growth visible across exchanges"""
+
+
 def create_criterion_prompt(
     criterion: CriterionData,
     retrieved_chunks: str,
@@ -95,7 +126,14 @@ def create_criterion_prompt(
     # Format scoring levels
     levels_text = format_levels(criterion.levels)
     
-    prompt = f"""ASSESSMENT TASK: Evaluate the following criterion from the rubric.
+    # Text shared by every criterion of a submission (assignment context and
+    # essay) comes first, so Ollama can reuse the cached prompt prefix from
+    # the previous criterion and only evaluate the criterion-specific rest
+    prompt = f"""ASSESSMENT TASK: Evaluate the rubric criterion given below the essay.
+
+{"ASSIGNMENT CONTEXT:" + chr(10) + assignment_context + chr(10) if assignment_context else ""}
+ESSAY (for reference):
+{essay_text[:3000]}{"..." if len(essay_text) > 3000 else ""}
 
 CRITERION: {criterion.name}
 POINTS POSSIBLE: {criterion.points}
@@ -103,43 +141,14 @@ POINTS POSSIBLE: {criterion.points}
 SCORING LEVELS:
 {levels_text}
 
-{"ASSIGNMENT CONTEXT:" + chr(10) + assignment_context + chr(10) if assignment_context else ""}
 RELEVANT CHAT HISTORY EXCERPTS:
 {retrieved_chunks}
 
-ESSAY (for reference):
-{essay_text[:3000]}{"..." if len(essay_text) > 3000 else ""}
-
 YOUR TASK:
 Assess this criterion based on the evidence provided in the chat history and essay.
 BE STRICT. This rubric evaluates the student's THINKING PROCESS, not just their ability to prompt AI.
 
-SCORING GUIDANCE - READ CAREFULLY:
-
-INADEQUATE (0-49% of points): The student shows one or more of these patterns:
-- Delegating thinking to AI ("give me a paragraph", "write this for me", "pick for me")
-- No original position or thesis stated before asking AI for help
-- Accepting AI output without any critical evaluation or modification
-- Simple factual queries with no depth ("what is X?")
-- No pushback, disagreement, or challenging of AI responses
-
-DEVELOPING (50-69% of points): The student shows:
-- Some direction given to AI, but still mostly passive
-- Occasional questions but no sustained engagement
-- Format-focused requests ("make it shorter") without substantive critique
-- May state a position but doesn't defend or develop it independently
-
-PROFICIENT (70-89% of points): The student demonstrates:
-- Clear original thinking BEFORE using AI as a tool
-- Meaningful pushback or questioning of AI responses (at least 2-3 instances)
-- Synthesis of information rather than copy-paste
-- Some evidence of intellectual struggle and growth
-
-EXEMPLARY (90-100% of points): The student demonstrates:
-- Strong original position articulated first, AI used to stress-test it
-- Multiple instances of disagreement, critique, or catching AI limitations
-- Clear evidence that the final work is the STUDENT'S, enhanced by AI
-- Sophisticated synthesis and intellectual growth visible across exchanges
+{_SCORING_GUIDANCE}
 
 You MUST respond with a JSON object in exactly this format:
 {{
@@ -293,49 +302,18 @@ def format_criterion_scores(results: list[dict]) -> str:
 # AUTHENTICITY CHECK PROMPT
 # =============================================================================
 
-def create_authenticity_prompt(
-    chat_history_stats: dict,
-    chat_excerpts: str,
-    essay_text: str,
-    mode: str = "conservative",
-) -> str:
-    """
-    Create a prompt for authenticity/integrity checking.
-    
-    Args:
-        chat_history_stats: Statistics about the chat history
-        chat_excerpts: Sample of chat exchanges
-        essay_text: The student's essay
-        mode: "conservative" (fewer false positives) or "aggressive" (catch more)
-        
-    Returns:
-        Formatted prompt string
-    """
-    threshold_note = """
+_CONSERVATIVE_NOTE = """
 NOTE: Use CONSERVATIVE thresholds. Only flag issues with clear evidence.
 A false accusation is worse than missing a minor issue.
-""" if mode == "conservative" else """
+"""
+
+_AGGRESSIVE_NOTE = """
 NOTE: Use THOROUGH analysis. Flag anything that seems unusual for instructor review.
 The instructor will make final determinations.
 """
 
-    prompt = f"""AUTHENTICITY ANALYSIS TASK: Analyze this submission for potential integrity concerns.
-
-{threshold_note}
-
-CHAT HISTORY STATISTICS:
-- Total exchanges: {chat_history_stats.get('total_exchanges', 0)}
-- Time span: {chat_history_stats.get('time_span', 'Unknown')}
-- Average prompt length: {chat_history_stats.get('avg_prompt_length', 0)} characters
-- Average response length: {chat_history_stats.get('avg_response_length', 0)} characters
-
-SAMPLE CHAT EXCHANGES:
-{chat_excerpts}
-
-ESSAY CONTENT:
-{essay_text[:4000]}{"..." if len(essay_text) > 4000 else ""}
-
-ANALYSIS CHECKLIST:
+# Shared by the authenticity and fused prompts
+_AUTHENTICITY_CHECKLIST = """ANALYSIS CHECKLIST:
 1. TIMESTAMP PATTERNS: Are intervals suspiciously regular or uniform?
 2. CONTENT ALIGNMENT: Does essay content appear to derive from the chat history?
 3. CONVERSATION NATURALNESS: Does conversation show natural confusion, mistakes, dead ends?
@@ -345,21 +323,36 @@ ANALYSIS CHECKLIST:
 7. DELEGATION PATTERNS: Frequent "give me", "write for me", "make this a paragraph" requests
 8. ORIGINAL THINKING: Does student ever state their OWN position before asking AI?
 9. INTELLECTUAL ENGAGEMENT: Does student ever disagree, push back, or challenge AI?
-10. SYNTHESIS vs COPY-PASTE: Did student integrate AI output or just paste it?
+10. SYNTHESIS vs COPY-PASTE: Did student integrate AI output or just paste it?"""
+
+# Constant fragments of the authenticity prompt; only the slots between
+# them change per submission
+_AUTHENTICITY_HEAD = """AUTHENTICITY ANALYSIS TASK: Analyze this submission for potential integrity concerns.
+
+"""
+
+_AUTHENTICITY_STATS = """
+
+CHAT HISTORY STATISTICS:
+- Total exchanges: """
+
+_AUTHENTICITY_TAIL = """
+
+""" + _AUTHENTICITY_CHECKLIST + """
 
 You MUST respond with a JSON object in exactly this format:
-{{
+{
     "authenticity_score": <0-100, where 100 is fully authentic>,
     "confidence": "<high|medium|low>",
     "flags": [
-        {{
+        {
             "type": "<timestamp|content|style|artifact|iteration>",
             "severity": "<low|medium|high>",
             "description": "<clear description of the concern>",
             "evidence": "<specific evidence supporting this flag>",
             "location": "<[CHAT:N] or general location>",
             "recommendation": "<what the instructor should look for>"
-        }}
+        }
     ],
     "positive_indicators": [
         "<evidence of genuine engagement>",
@@ -367,7 +360,7 @@ You MUST respond with a JSON object in exactly this format:
         "<signs of authentic struggle/learning>"
     ],
     "overall_assessment": "<2-3 sentence summary of authenticity analysis>"
-}}
+}
 
 CRITICAL REMINDERS:
 - These are FLAGS FOR REVIEW, not accusations
@@ -376,13 +369,289 @@ CRITICAL REMINDERS:
 - Always note positive indicators of genuine work
 - Be specific about evidence - never make vague accusations"""
 
-    return prompt
+_AUTHENTICITY_ESSAY_LIMIT = 4000
+
+# JSON Schema for the authenticity response, passed to Ollama as `format`
+# so decoding is constrained to this shape
+AUTHENTICITY_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "authenticity_score": {"type": "integer", "minimum": 0, "maximum": 100},
+        "confidence": {"type": "string", "enum": ["high", "medium", "low"]},
+        "flags": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "type": {
+                        "type": "string",
+                        "enum": ["timestamp", "content", "style", "artifact", "iteration"],
+                    },
+                    "severity": {"type": "string", "enum": ["low", "medium", "high"]},
+                    "description": {"type": "string"},
+                    "evidence": {"type": "string"},
+                    "location": {"type": "string"},
+                    "recommendation": {"type": "string"},
+                },
+                "required": ["type", "severity", "description", "evidence", "location", "recommendation"],
+            },
+        },
+        "positive_indicators": {"type": "array", "items": {"type": "string"}},
+        "overall_assessment": {"type": "string"},
+    },
+    "required": [
+        "authenticity_score",
+        "confidence",
+        "flags",
+        "positive_indicators",
+        "overall_assessment",
+    ],
+}
+
+
+def create_authenticity_prompt(
+    chat_history_stats: dict,
+    chat_excerpts: str,
+    essay_text: str,
+    mode: str = "conservative",
+) -> str:
+    """
+    Create a prompt for authenticity/integrity checking.
+    
+    Args:
+        chat_history_stats: Statistics about the chat history
+        chat_excerpts: Sample of chat exchanges
+        essay_text: The student's essay
+        mode: "conservative" (fewer false positives) or "aggressive" (catch more)
+        
+    Returns:
+        Formatted prompt string
+    """
+    threshold_note = _CONSERVATIVE_NOTE if mode == "conservative" else _AGGRESSIVE_NOTE
+    if len(essay_text) > _AUTHENTICITY_ESSAY_LIMIT:
+        essay_slice, ellipsis = essay_text[:_AUTHENTICITY_ESSAY_LIMIT], "..."
+    else:
+        essay_slice, ellipsis = essay_text, ""
+
+    return "".join((
+        _AUTHENTICITY_HEAD,
+        threshold_note,
+        _AUTHENTICITY_STATS,
+        str(chat_history_stats.get('total_exchanges', 0)),
+        "\n- Time span: ",
+        str(chat_history_stats.get('time_span', 'Unknown')),
+        "\n- Average prompt length: ",
+        str(chat_history_stats.get('avg_prompt_length', 0)),
+        " characters\n- Average response length: ",
+        str(chat_history_stats.get('avg_response_length', 0)),
+        " characters\n\nSAMPLE CHAT EXCHANGES:\n",
+        chat_excerpts,
+        "\n\nESSAY CONTENT:\n",
+        essay_slice,
+        ellipsis,
+        _AUTHENTICITY_TAIL,
+    ))
+
+
+# =============================================================================
+# FUSED ASSESSMENT PROMPT
+# =============================================================================
+
+# JSON Schema for one criterion's result inside the fused response
+CRITERION_RESULT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "points_earned": {"type": "number", "minimum": 0},
+        "level": {"type": "string", "enum": ["exemplary", "proficient", "developing", "inadequate"]},
+        "reasoning": {"type": "string"},
+        "evidence": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "type": {"type": "string", "enum": ["chat_exchange", "essay_section"]},
+                    "reference": {"type": "string"},
+                    "citation": {"type": "string"},
+                    "excerpt": {"type": "string"},
+                    "analysis": {"type": "string"},
+                },
+                "required": ["type", "reference", "citation", "excerpt", "analysis"],
+            },
+        },
+        "feedback": {"type": "string"},
+        "confidence": {"type": "string", "enum": ["high", "medium", "low"]},
+    },
+    "required": ["points_earned", "level", "reasoning", "evidence", "feedback", "confidence"],
+}
+
+
+def create_fused_schema(criteria: list[CriterionData], include_authenticity: bool = True) -> dict:
+    """
+    Build the JSON Schema for a fused assessment response.
+    
+    Every criterion is a required key of "criteria", so constrained
+    decoding cannot skip one.
+    """
+    properties = {
+        "criteria": {
+            "type": "object",
+            "properties": {c.name: CRITERION_RESULT_SCHEMA for c in criteria},
+            "required": [c.name for c in criteria],
+        },
+    }
+    if include_authenticity:
+        properties["authenticity"] = AUTHENTICITY_SCHEMA
+    
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": list(properties),
+    }
+
+
+def create_fused_prompt(
+    criteria: list[tuple[CriterionData, str]],
+    essay_text: str,
+    assignment_context: Optional[str] = None,
+    chat_history_stats: Optional[dict] = None,
+    chat_excerpts: Optional[str] = None,
+    mode: str = "conservative",
+) -> str:
+    """
+    Create one prompt that scores every criterion (and optionally checks
+    authenticity) in a single generation.
+    
+    The essay is placed once, ahead of the per-criterion material, so the
+    model processes it a single time instead of once per criterion.
+    
+    Args:
+        criteria: (criterion, retrieved chat excerpts) pairs, in rubric order
+        essay_text: The student's essay
+        assignment_context: Optional assignment description
+        chat_history_stats: Statistics for the authenticity check (None to skip it)
+        chat_excerpts: Sample of chat exchanges for the authenticity check
+        mode: "conservative" or "aggressive" authenticity thresholds
+        
+    Returns:
+        Formatted prompt string
+    """
+    if len(essay_text) > _AUTHENTICITY_ESSAY_LIMIT:
+        essay_slice, ellipsis = essay_text[:_AUTHENTICITY_ESSAY_LIMIT], "..."
+    else:
+        essay_slice, ellipsis = essay_text, ""
+    
+    parts = [
+        "COMBINED ASSESSMENT TASK: Evaluate every rubric criterion below",
+        " and check the submission's authenticity." if chat_history_stats is not None else ".",
+        "\n\nESSAY:\n",
+        essay_slice,
+        ellipsis,
+        "\n\n",
+    ]
+    if assignment_context:
+        parts += ["ASSIGNMENT CONTEXT:\n", assignment_context, "\n\n"]
+    
+    for i, (criterion, retrieved_chunks) in enumerate(criteria, 1):
+        parts += [
+            f"--- CRITERION {i}: {criterion.name} ---\n",
+            f"POINTS POSSIBLE: {criterion.points}\n\n",
+            "SCORING LEVELS:",
+            format_levels(criterion.levels),
+            "\n\nRELEVANT CHAT HISTORY EXCERPTS:\n",
+            retrieved_chunks,
+            "\n\n",
+        ]
+    
+    parts += [
+        "YOUR TASK:\n",
+        "Assess each criterion based on the evidence provided in its chat history excerpts and the essay.\n",
+        "BE STRICT. This rubric evaluates the student's THINKING PROCESS, not just their ability to prompt AI.\n\n",
+        _SCORING_GUIDANCE,
+        "\n\n",
+    ]
+    
+    if chat_history_stats is not None:
+        parts += [
+            "AUTHENTICITY ANALYSIS:",
+            _CONSERVATIVE_NOTE if mode == "conservative" else _AGGRESSIVE_NOTE,
+            "\nCHAT HISTORY STATISTICS:\n- Total exchanges: ",
+            str(chat_history_stats.get('total_exchanges', 0)),
+            "\n- Time span: ",
+            str(chat_history_stats.get('time_span', 'Unknown')),
+            "\n- Average prompt length: ",
+            str(chat_history_stats.get('avg_prompt_length', 0)),
+            " characters\n- Average response length: ",
+            str(chat_history_stats.get('avg_response_length', 0)),
+            " characters\n\nSAMPLE CHAT EXCHANGES:\n",
+            chat_excerpts or "",
+            "\n\n",
+            _AUTHENTICITY_CHECKLIST,
+            "\n\n",
+        ]
+    
+    parts += [
+        "You MUST respond with a JSON object with a \"criteria\" object containing one entry per",
+        " criterion, keyed by the exact criterion name, each with points_earned, level",
+        " (exemplary|proficient|developing|inadequate), reasoning, evidence (list of",
+        " {type, reference, citation, excerpt, analysis}), feedback and confidence (high|medium|low).",
+    ]
+    if chat_history_stats is not None:
+        parts.append(
+            " Also include an \"authenticity\" object with authenticity_score (0-100),"
+            " confidence, flags, positive_indicators and overall_assessment."
+        )
+    parts.append(
+        "\n\nCRITICAL REMINDERS:\n"
+        "- Every score MUST have at least one piece of evidence\n"
+        "- Score each criterion only on its own excerpts and the essay\n"
+        "- Do not invent evidence that isn't in the excerpts provided\n"
+        "- When in doubt, score LOWER - this is an assessment of thinking, not prompting skill"
+    )
+    
+    return "".join(parts)
 
 
 # =============================================================================
 # HELPER FUNCTIONS
 # =============================================================================
 
+# Search queries for the default rubric criteria (built once, read-only)
+_QUERY_MAP = MappingProxyType({
+    "Starting Point & Initial Thinking": 
+        "What are the student's initial thoughts, position, thesis, or research question at the beginning of the conversation? Does the student state their OWN position BEFORE asking AI for help? Look for original thinking vs. immediately asking AI 'what is X' or 'tell me about X'.",
+    
+    "Iterative Refinement & Critical Engagement":
+        "Where does the student push back, disagree, ask for clarification, request revisions, challenge the AI, or iterate on ideas? Look for 'I disagree', 'but what about', 'that doesn't make sense'. Also look for DELEGATION patterns: 'give me a paragraph', 'write this for me', 'make this a paragraph I can use'.",
+    
+    "Perspective Exploration & Intellectual Honesty":
+        "Where does the student ask for counterarguments, opposing views, different perspectives, or challenges to their thesis? Does the student genuinely WRESTLE with opposing views or just collect them? Intellectual flexibility and honesty.",
+    
+    "Research & Source Integration":
+        "Where does the student ask for sources, verify claims, fact-check, request evidence, or integrate research? Did the student verify AI claims or just accept them? Source evaluation and verification.",
+    
+    "Process Reflection Quality":
+        "Where does the student reflect on their process, discuss what they learned, acknowledge AI limitations, or show metacognitive awareness? Look for self-awareness about their learning.",
+    
+    "Intellectual Growth & Position Evolution":
+        "How does the student's position, thesis, or thinking change over the conversation? Did the student's thinking EVOLVE or did they just accept what AI told them? Evidence of genuine intellectual growth.",
+    
+    "Complete Documentation":
+        "Evidence of complete conversation from start to finish, nothing appears edited or missing.",
+    
+    "Honesty & Attribution":
+        "Where does the student acknowledge AI contributions, distinguish their ideas from AI's, or show transparency? Look for 'the AI suggested' or 'I combined my idea with AI's'.",
+    
+    "Coherence & Structure":
+        "Discussion of essay structure, thesis development, organization, transitions, or argument flow. Did student direct this or delegate to AI?",
+    
+    "Depth & Insight":
+        "Deep analysis, nuanced thinking, complex ideas, insights beyond surface level. Look for student's ORIGINAL insights vs. just repeating what AI said.",
+    
+    "Writing Quality":
+        "Discussion of writing style, voice, tone, grammar, editing, or prose quality. Is the voice distinctly the student's or generic AI-speak?",
+})
+
+
 def create_query_for_criterion(criterion_name: str) -> str:
     """
     Create a semantic search query for a rubric criterion.
@@ -390,44 +659,12 @@ def create_query_for_criterion(criterion_name: str) -> str:
     Maps criterion names to search queries that will retrieve
     relevant chat history excerpts.
     """
-    query_map = {
-        "Starting Point & Initial Thinking": 
-            "What are the student's initial thoughts, position, thesis, or research question at the beginning of the conversation? Does the student state their OWN position BEFORE asking AI for help? Look for original thinking vs. immediately asking AI 'what is X' or 'tell me about X'.",
-        
-        "Iterative Refinement & Critical Engagement":
-            "Where does the student push back, disagree, ask for clarification, request revisions, challenge the AI, or iterate on ideas? Look for 'I disagree', 'but what about', 'that doesn't make sense'. Also look for DELEGATION patterns: 'give me a paragraph', 'write this for me', 'make this a paragraph I can use'.",
-        
-        "Perspective Exploration & Intellectual Honesty":
-            "Where does the student ask for counterarguments, opposing views, different perspectives, or challenges to their thesis? Does the student genuinely WRESTLE with opposing views or just collect them? Intellectual flexibility and honesty.",
-        
-        "Research & Source Integration":
-            "Where does the student ask for sources, verify claims, fact-check, request evidence, or integrate research? Did the student verify AI claims or just accept them? Source evaluation and verification.",
-        
-        "Process Reflection Quality":
-            "Where does the student reflect on their process, discuss what they learned, acknowledge AI limitations, or show metacognitive awareness? Look for self-awareness about their learning.",
-        
-        "Intellectual Growth & Position Evolution":
-            "How does the student's position, thesis, or thinking change over the conversation? Did the student's thinking EVOLVE or did they just accept what AI told them? Evidence of genuine intellectual growth.",
-        
-        "Complete Documentation":
-            "Evidence of complete conversation from start to finish, nothing appears edited or missing.",
-        
-        "Honesty & Attribution":
-            "Where does the student acknowledge AI contributions, distinguish their ideas from AI's, or show transparency? Look for 'the AI suggested' or 'I combined my idea with AI's'.",
-        
-        "Coherence & Structure":
-            "Discussion of essay structure, thesis development, organization, transitions, or argument flow. Did student direct this or delegate to AI?",
-        
-        "Depth & Insight":
-            "Deep analysis, nuanced thinking, complex ideas, insights beyond surface level. Look for student's ORIGINAL insights vs. just repeating what AI said.",
-        
-        "Writing Quality":
-            "Discussion of writing style, voice, tone, grammar, editing, or prose quality. Is the voice distinctly the student's or generic AI-speak?",
-    }
-    
-    return query_map.get(
-        criterion_name,
-        f"Evidence related to: {criterion_name}"
-    )
+    return _QUERY_MAP.get(criterion_name) or _fallback_query(criterion_name)
+
+
+@lru_cache(maxsize=128)
+def _fallback_query(criterion_name: str) -> str:
+    """Generic query for criteria without a hand-written mapping."""
+    return f"Evidence related to: {criterion_name}"
 
 
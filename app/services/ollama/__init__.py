@@ -7,6 +7,10 @@ from app.services.ollama.client import (
     list_available_models,
     generate_completion,
     generate_embeddings,
+    get_shared_client,
+    close_shared_client,
+    quantize_int8,
+    wait_for_model_warmup,
 )
 
 __all__ = [
@@ -16,6 +20,10 @@ __all__ = [
     "list_available_models",
     "generate_completion",
     "generate_embeddings",
+    "get_shared_client",
+    "close_shared_client",
+    "quantize_int8",
+    "wait_for_model_warmup",
 ]
 
 
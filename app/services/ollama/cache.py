@@ -0,0 +1,151 @@
+"""
+Embedding Cache
+
+Persistent store for embedding vectors, keyed by a hash of (model, text).
+Identical texts - e.g. the fixed criterion queries used for retrieval -
+are only sent to Ollama once; later calls are served from disk, and the
+most recently used vectors straight from memory.
+"""
+
+import hashlib
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterable, Optional
+
+from app.config import get_settings
+
+settings = get_settings()
+
+# SQLite's default limit on host parameters per statement is 999
+_MAX_QUERY_PARAMS = 500
+
+
+class EmbeddingCache:
+    """
+    SQLite-backed embedding store.
+
+    Vectors are stored as packed float32 blobs (Ollama computes embeddings
+    in float32, so no precision is lost).
+
+    Usage:
+        cache = EmbeddingCache("./data/embedding_cache.sqlite")
+        key = cache.make_key("some text", "bge-m3")
+        cache.set_many({key: vector})
+        hits = cache.get_many([key])
+    """
+
+    def __init__(self, path: str | Path, memory_size: int = 0):
+        self.path = Path(path)
+        self.memory_size = memory_size
+        self._memory: OrderedDict[bytes, list[float]] = OrderedDict()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key BLOB PRIMARY KEY, vector BLOB NOT NULL)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(text: str, model: str) -> bytes:
+        """Hash a text for a given model into a 16-byte cache key."""
+        return hashlib.blake2b(
+            text.encode("utf-8"),
+            digest_size=16,
+            key=model.encode("utf-8")[:64],
+        ).digest()
+
+    def get_many(self, keys: Iterable[bytes]) -> dict[bytes, list[float]]:
+        """Look up several keys at once; missing keys are simply absent."""
+        found: dict[bytes, list[float]] = {}
+        misses: list[bytes] = []
+        
+        with self._lock:
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is None:
+                    misses.append(key)
+                else:
+                    self._memory.move_to_end(key)
+                    found[key] = vector
+            
+            for i in range(0, len(misses), _MAX_QUERY_PARAMS):
+                batch = misses[i:i + _MAX_QUERY_PARAMS]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                    batch,
+                )
+                for key, blob in rows:
+                    vector = array("f")
+                    vector.frombytes(blob)
+                    found[key] = vector.tolist()
+                    self._remember(key, found[key])
+        
+        return found
+    
+    def set_many(self, items: dict[bytes, list[float]]) -> None:
+        """Store several vectors, replacing any existing entries."""
+        if not items:
+            return
+        
+        rows = [
+            (key, array("f", vector).tobytes())
+            for key, vector in items.items()
+            if vector
+        ]
+        
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                rows,
+            )
+            self._conn.commit()
+            for key, vector in items.items():
+                if vector:
+                    self._remember(key, vector)
+    
+    def _remember(self, key: bytes, vector: list[float]) -> None:
+        """Add a vector to the in-memory LRU, evicting the oldest (lock held)."""
+        if self.memory_size <= 0:
+            return
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+    
+    def clear(self) -> None:
+        """Remove all cached vectors."""
+        with self._lock:
+            self._memory.clear()
+            self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+_embedding_cache: Optional[EmbeddingCache] = None
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """Get the process-wide embedding cache (None when disabled)."""
+    global _embedding_cache
+
+    if not settings.embedding_cache_enabled:
+        return None
+
+    if _embedding_cache is None:
+        _embedding_cache = EmbeddingCache(
+            settings.embedding_cache_path,
+            memory_size=settings.embedding_cache_memory_size,
+        )
+
+    return _embedding_cache
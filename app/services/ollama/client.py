@@ -10,19 +10,30 @@ Supports:
 """
 
 import asyncio
-from dataclasses import dataclass
-from typing import Optional, Any
+import importlib.util
+import random
+import time
+from contextlib import asynccontextmanager, suppress
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from typing import AsyncIterator, Optional, Any
 
 import httpx
+import numpy as np
 import orjson
-from tenacity import retry, stop_after_attempt, wait_exponential
 
 from app.config import get_settings
+from app.services.ollama.cache import get_embedding_cache
 
 settings = get_settings()
 
+_JSON_HEADERS = {"Content-Type": "application/json"}
 
-@dataclass
+# Upstream errors worth retrying (Ollama restarting or behind a proxy)
+_RETRY_STATUS_CODES = frozenset({502, 503, 504})
+
+
+@dataclass(slots=True, frozen=True)
 class OllamaModel:
     """Information about an available Ollama model."""
     name: str
@@ -32,6 +43,7 @@ class OllamaModel:
     family: Optional[str] = None
     parameter_size: Optional[str] = None
     quantization: Optional[str] = None
+    context_length: Optional[int] = None  # Only set by list_models_detailed
     
     @classmethod
     def from_api_response(cls, data: dict) -> "OllamaModel":
@@ -49,6 +61,22 @@ class OllamaModel:
             quantization=details.get("quantization_level"),
         )
     
+    def with_show_response(self, data: dict) -> "OllamaModel":
+        """Return a copy enriched with an /api/show response."""
+        details = data.get("details") or {}
+        context_length = next(
+            (v for k, v in (data.get("model_info") or {}).items() if k.endswith(".context_length")),
+            None,
+        )
+        
+        return replace(
+            self,
+            family=details.get("family", self.family),
+            parameter_size=details.get("parameter_size", self.parameter_size),
+            quantization=details.get("quantization_level", self.quantization),
+            context_length=context_length,
+        )
+    
     def to_dict(self) -> dict:
         return {
             "name": self.name,
@@ -58,22 +86,139 @@ class OllamaModel:
             "family": self.family,
             "parameter_size": self.parameter_size,
             "quantization": self.quantization,
+            "context_length": self.context_length,
         }
 
 
+def _parse_keep_alive(value: str) -> str | int:
+    """Ollama reads bare numbers as seconds (negative keeps the model loaded)."""
+    try:
+        return int(value)
+    except ValueError:
+        return value
+
+
+_DEFAULT_KEEP_ALIVE = _parse_keep_alive(settings.ollama_keep_alive)
+
+
+@lru_cache(maxsize=32)
+def _payload_head(
+    model: str,
+    stream: bool,
+    system: Optional[str],
+    format: Optional[bytes],
+    keep_alive: str | int,
+) -> bytes:
+    """
+    Encode the fields shared by every request for a model/system/format.
+    
+    The closing brace is left off so per-call fields (prompt, messages,
+    options) can be appended as bytes without re-encoding the system prompt.
+    format is passed pre-encoded (see _encode_format) so schemas can be cached.
+    """
+    fields: dict[str, Any] = {"model": model, "stream": stream, "keep_alive": keep_alive}
+    if system:
+        fields["system"] = system
+    head = orjson.dumps(fields)[:-1]
+    if format:
+        head += b',"format":' + format
+    return head
+
+
+def _encode_format(format: Optional[str | dict]) -> Optional[bytes]:
+    """Encode a format value: "json" or a JSON Schema dict for structured output."""
+    if not format:
+        return None
+    return orjson.dumps(format)
+
+
+def _options_field(options: Optional[dict]) -> bytes:
+    """Encode the optional "options" member (empty when not set)."""
+    if not options:
+        return b""
+    return b',"options":' + orjson.dumps(options)
+
+
+_SIZE_UNITS = ("B", "KB", "MB", "GB", "TB", "PB")
+
+
 def _format_size(size_bytes: int) -> str:
     """Format bytes to human-readable string."""
-    for unit in ["B", "KB", "MB", "GB", "TB"]:
-        if size_bytes < 1024:
-            return f"{size_bytes:.1f} {unit}"
-        size_bytes /= 1024
-    return f"{size_bytes:.1f} PB"
+    if size_bytes < 1024:
+        return f"{size_bytes:.1f} B"
+    # Each unit is 2**10 of the previous one, so the bit length picks it directly
+    unit_idx = min((int(size_bytes).bit_length() - 1) // 10, len(_SIZE_UNITS) - 1)
+    return f"{size_bytes / (1 << (10 * unit_idx)):.1f} {_SIZE_UNITS[unit_idx]}"
+
+
+# HTTP/2 needs the optional h2 package (pip install "httpx[http2]")
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Process-wide connection pool for the configured Ollama server
+_shared_client: Optional[httpx.AsyncClient] = None
+_shared_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_shared_client() -> httpx.AsyncClient:
+    """
+    Get the shared httpx client for settings.ollama_base_url.
+    
+    The client is created lazily and reused by every OllamaClient pointed
+    at the default server, so keep-alive connections are amortized across
+    calls instead of being rebuilt per request.
+    
+    Returns:
+        The shared httpx.AsyncClient
+    """
+    global _shared_client, _shared_client_loop
+    
+    # No await between the check and the assignment, so concurrent tasks
+    # on the same loop cannot create two clients
+    loop = asyncio.get_running_loop()
+    
+    # Pooled connections are bound to the loop that opened them
+    if _shared_client is None or _shared_client.is_closed or _shared_client_loop is not loop:
+        _shared_client = httpx.AsyncClient(
+            base_url=settings.ollama_base_url,
+            timeout=httpx.Timeout(300.0, connect=10.0),
+            # Keep idle connections for a minute (httpx defaults to 5s) so
+            # they survive the gaps between embedding batches and analysis calls
+            limits=httpx.Limits(
+                max_keepalive_connections=32,
+                max_connections=64,
+                keepalive_expiry=60.0,
+            ),
+            # Negotiated via ALPN, so only effective for https:// (e.g. a TLS proxy)
+            http2=settings.ollama_http2 and _HTTP2_AVAILABLE,
+        )
+        _shared_client_loop = loop
+    
+    return _shared_client
+
+
+async def close_shared_client() -> None:
+    """Close the shared httpx client (call on application shutdown)."""
+    global _shared_client, _shared_client_loop
+    
+    client = _shared_client
+    _shared_client = None
+    _shared_client_loop = None
+    
+    if client is not None and not client.is_closed:
+        await client.aclose()
+
+
+# base_url -> (fetched_at, etag, models sorted by name)
+_models_cache: dict[str, tuple[float, Optional[str], list[OllamaModel]]] = {}
 
 
 class OllamaClient:
     """
     Async client for Ollama API.
     
+    Clients for the default server borrow the shared connection pool, so
+    entering a context is cheap; clients for other servers own their pool.
+    
     Usage:
         async with OllamaClient() as client:
             models = await client.list_models()
@@ -83,18 +228,27 @@ class OllamaClient:
     def __init__(self, base_url: Optional[str] = None, timeout: float = 300.0):
         self.base_url = base_url or settings.ollama_base_url
         self.timeout = timeout
+        self._timeout = httpx.Timeout(timeout, connect=10.0)
         self._client: Optional[httpx.AsyncClient] = None
+        self._owns_client = False
+        self._pinned_models: set[str] = set()
     
     async def __aenter__(self) -> "OllamaClient":
-        self._client = httpx.AsyncClient(
-            base_url=self.base_url,
-            timeout=httpx.Timeout(self.timeout, connect=10.0),
-        )
+        if self.base_url == settings.ollama_base_url:
+            self._client = get_shared_client()
+            self._owns_client = False
+        else:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self._timeout,
+            )
+            self._owns_client = True
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self._client:
+        if self._client and self._owns_client:
             await self._client.aclose()
+        self._client = None
     
     @property
     def client(self) -> httpx.AsyncClient:
@@ -102,50 +256,145 @@ class OllamaClient:
             raise RuntimeError("Client not initialized. Use 'async with OllamaClient() as client:'")
         return self._client
     
+    async def _post_json(self, path: str, payload: dict | bytes) -> Any:
+        """POST a payload (dict or pre-encoded JSON bytes) and decode the reply with orjson."""
+        response = await self.client.post(
+            path,
+            content=payload if isinstance(payload, bytes) else orjson.dumps(payload),
+            headers=_JSON_HEADERS,
+            timeout=self._timeout,
+        )
+        response.raise_for_status()
+        return orjson.loads(response.content)
+    
+    def _keep_alive(self, model: str) -> str | int:
+        """keep_alive value to send for a model (-1 while pinned)."""
+        return -1 if model in self._pinned_models else _DEFAULT_KEEP_ALIVE
+    
+    @asynccontextmanager
+    async def pin_model(self, model: Optional[str] = None) -> AsyncIterator["OllamaClient"]:
+        """
+        Keep a model resident in memory for the duration of a batch job.
+        
+        Requests for the model made through this client send keep_alive=-1
+        so Ollama never unloads it between calls; on exit the model is
+        released with keep_alive=0 to free VRAM.
+        
+        Usage:
+            async with client.pin_model("qwen3:32b"):
+                await client.generate_many(prompts, model="qwen3:32b")
+        """
+        model = model or settings.default_analysis_model
+        self._pinned_models.add(model)
+        try:
+            yield self
+        finally:
+            self._pinned_models.discard(model)
+            # An empty request only changes the model's residency
+            with suppress(Exception):
+                await self._post_json("/api/generate", {"model": model, "keep_alive": 0})
+    
     async def is_connected(self) -> bool:
         """Check if Ollama server is reachable."""
         try:
-            response = await self.client.get("/api/tags")
+            response = await self.client.get("/api/tags", timeout=self._timeout)
             return response.status_code == 200
         except Exception:
             return False
     
-    async def list_models(self) -> list[OllamaModel]:
-        """List all available models."""
+    async def list_models(self, refresh: bool = False) -> list[OllamaModel]:
+        """
+        List all available models.
+        
+        The sorted inventory is cached per server for
+        settings.ollama_models_cache_ttl seconds; after that it is
+        revalidated with If-None-Match when the server sent an ETag.
+        
+        Args:
+            refresh: Skip the TTL and revalidate with the server
+        """
+        cached = _models_cache.get(self.base_url)
+        now = time.monotonic()
+        if cached and not refresh and now - cached[0] < settings.ollama_models_cache_ttl:
+            return list(cached[2])
+        
+        headers = {"If-None-Match": cached[1]} if cached and cached[1] else None
+        
         try:
-            response = await self.client.get("/api/tags")
-            response.raise_for_status()
-            data = response.json()
-            
-            models = []
-            for model_data in data.get("models", []):
-                models.append(OllamaModel.from_api_response(model_data))
-            
-            return sorted(models, key=lambda m: m.name)
+            response = await self.client.get("/api/tags", headers=headers, timeout=self._timeout)
+            if response.status_code == 304 and cached:
+                models = cached[2]
+            else:
+                response.raise_for_status()
+                data = orjson.loads(response.content)
+                models = sorted(
+                    (OllamaModel.from_api_response(m) for m in data.get("models", [])),
+                    key=lambda m: m.name,
+                )
         except Exception as e:
             raise ConnectionError(f"Failed to list models: {e}")
+        
+        _models_cache[self.base_url] = (now, response.headers.get("etag"), models)
+        return list(models)
     
     async def get_model_info(self, model_name: str) -> dict:
         """Get detailed information about a specific model."""
         try:
-            response = await self.client.post(
-                "/api/show",
-                json={"name": model_name}
-            )
-            response.raise_for_status()
-            return response.json()
+            return await self._post_json("/api/show", {"name": model_name})
         except Exception as e:
             raise ConnectionError(f"Failed to get model info for {model_name}: {e}")
     
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=1, max=10))
+    async def list_models_detailed(self, max_concurrency: int = 8, refresh: bool = False) -> list[OllamaModel]:
+        """
+        List all models with /api/show details, fetched concurrently.
+        
+        Models whose details cannot be fetched are returned as listed.
+        
+        Args:
+            max_concurrency: Maximum number of in-flight /api/show requests
+            refresh: Skip the model list cache TTL (see list_models)
+        """
+        models = await self.list_models(refresh=refresh)
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        
+        async def _detail(model: OllamaModel) -> OllamaModel:
+            async with semaphore:
+                try:
+                    info = await self.get_model_info(model.name)
+                except ConnectionError:
+                    return model
+            return model.with_show_response(info)
+        
+        return list(await asyncio.gather(*(_detail(m) for m in models)))
+    
+    async def _post_with_retry(self, path: str, payload: dict | bytes, max_attempts: int = 3) -> Any:
+        """
+        POST with retries on transient failures.
+        
+        Connection resets and 502/503/504 replies are retried with jittered
+        exponential backoff. Timeouts and other errors are raised at once,
+        since repeating a long generation that timed out only adds latency.
+        """
+        for attempt in range(max_attempts):
+            try:
+                return await self._post_json(path, payload)
+            except (httpx.ConnectError, httpx.ReadError):
+                if attempt == max_attempts - 1:
+                    raise
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code not in _RETRY_STATUS_CODES or attempt == max_attempts - 1:
+                    raise
+            await asyncio.sleep(min(8.0, 0.5 * 2 ** attempt) + random.uniform(0, 0.25))
+    
     async def generate(
         self,
         prompt: str,
         model: Optional[str] = None,
         system: Optional[str] = None,
-        format: Optional[str] = None,  # "json" for JSON mode
+        format: Optional[str | dict] = None,  # "json" or a JSON Schema
         options: Optional[dict] = None,
         stream: bool = False,
+        return_context: bool = False,
     ) -> dict:
         """
         Generate a completion from Ollama.
@@ -154,45 +403,84 @@ class OllamaClient:
             prompt: The prompt to send
             model: Model name (defaults to settings.default_analysis_model)
             system: System prompt
-            format: Response format ("json" for structured output)
+            format: Response format ("json", or a JSON Schema dict to constrain output)
             options: Model options (temperature, top_p, etc.)
             stream: Whether to stream the response
+            return_context: Keep the 'context' token array in the result
             
         Returns:
             dict with 'response' key containing generated text
         """
         model = model or settings.default_analysis_model
         
-        payload = {
-            "model": model,
-            "prompt": prompt,
-            "stream": stream,
-        }
-        
-        if system:
-            payload["system"] = system
-        if format:
-            payload["format"] = format
-        if options:
-            payload["options"] = options
+        body = b"".join((
+            _payload_head(model, stream, system, _encode_format(format), self._keep_alive(model)),
+            b',"prompt":',
+            orjson.dumps(prompt),
+            _options_field(options),
+            b"}",
+        ))
         
         try:
-            response = await self.client.post(
-                "/api/generate",
-                json=payload,
-            )
-            response.raise_for_status()
-            return response.json()
+            data = await self._post_with_retry("/api/generate", body)
         except httpx.TimeoutException:
             raise TimeoutError(f"Request to {model} timed out after {self.timeout}s")
         except Exception as e:
             raise RuntimeError(f"Generation failed: {e}")
+        
+        # The token-id context can be far larger than the text; drop it
+        # unless the caller wants to continue the conversation with it
+        if not return_context:
+            data.pop("context", None)
+        return data
+
+    async def generate_many(
+        self,
+        prompts: list[str],
+        model: Optional[str] = None,
+        system: Optional[str] = None,
+        format: Optional[str | dict] = None,
+        options: Optional[dict] = None,
+        max_concurrency: int = 8,
+    ) -> list[dict]:
+        """
+        Generate completions for several prompts concurrently.
+        
+        Requests share this client's connection pool and are dispatched
+        together (bounded by max_concurrency), so Ollama can overlap them
+        up to its OLLAMA_NUM_PARALLEL limit instead of serving one
+        round-trip at a time.
+        
+        Args:
+            prompts: Prompts to send
+            model: Model name (defaults to settings.default_analysis_model)
+            system: System prompt shared by every request
+            format: Response format ("json" or a JSON Schema dict)
+            options: Model options shared by every request
+            max_concurrency: Maximum number of in-flight requests
+        
+        Returns:
+            List of response dicts, in the same order as prompts
+        """
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        
+        async def _generate_one(prompt: str) -> dict:
+            async with semaphore:
+                return await self.generate(
+                    prompt=prompt,
+                    model=model,
+                    system=system,
+                    format=format,
+                    options=options,
+                )
+        
+        return await asyncio.gather(*(_generate_one(p) for p in prompts))
     
     async def chat(
         self,
         messages: list[dict],
         model: Optional[str] = None,
-        format: Optional[str] = None,
+        format: Optional[str | dict] = None,
         options: Optional[dict] = None,
         stream: bool = False,
     ) -> dict:
@@ -211,24 +499,16 @@ class OllamaClient:
         """
         model = model or settings.default_analysis_model
         
-        payload = {
-            "model": model,
-            "messages": messages,
-            "stream": stream,
-        }
-        
-        if format:
-            payload["format"] = format
-        if options:
-            payload["options"] = options
+        body = b"".join((
+            _payload_head(model, stream, None, _encode_format(format), self._keep_alive(model)),
+            b',"messages":',
+            orjson.dumps(messages),
+            _options_field(options),
+            b"}",
+        ))
         
         try:
-            response = await self.client.post(
-                "/api/chat",
-                json=payload,
-            )
-            response.raise_for_status()
-            return response.json()
+            return await self._post_json("/api/chat", body)
         except httpx.TimeoutException:
             raise TimeoutError(f"Chat request to {model} timed out")
         except Exception as e:
@@ -238,16 +518,26 @@ class OllamaClient:
         self,
         text: str | list[str],
         model: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        use_cache: bool = True,
     ) -> list[list[float]]:
         """
         Generate embeddings for text.
         
+        Vectors are memoized in the persistent embedding cache, keyed by a
+        hash of (model, text); only texts not seen before are sent to Ollama.
+        Large inputs are split into batches of batch_size texts; each batch
+        is one /api/embed request, and batches are sent concurrently (capped
+        by settings.ollama_max_concurrent_embed_batches).
+        
         Args:
             text: Single string or list of strings to embed
             model: Embedding model name
+            batch_size: Texts per request (defaults to settings.ollama_embed_batch_size)
+            use_cache: Whether to read/write the embedding cache
             
         Returns:
-            List of embedding vectors
+            List of embedding vectors, in input order
         """
         model = model or settings.default_embedding_model
         
@@ -255,23 +545,216 @@ class OllamaClient:
         if isinstance(text, str):
             texts = [text]
         else:
-            texts = text
+            texts = list(text)
+        
+        if not texts:
+            return []
+        
+        cache = get_embedding_cache() if use_cache else None
+        if cache is None:
+            return _check_embedding_count(
+                await self._embed_uncached(texts, model, batch_size), len(texts)
+            )
+        
+        # SQLite lookups and commits block, so they run in a worker thread
+        keys = [cache.make_key(t, model) for t in texts]
+        cached = await asyncio.to_thread(cache.get_many, set(keys))
+        
+        # Embed each distinct missing text once
+        missing: dict[bytes, str] = {}
+        for key, t in zip(keys, texts):
+            if key not in cached and key not in missing:
+                missing[key] = t
+        
+        if missing:
+            fresh = _check_embedding_count(
+                await self._embed_uncached(list(missing.values()), model, batch_size),
+                len(missing),
+            )
+            computed = dict(zip(missing.keys(), fresh))
+            await asyncio.to_thread(cache.set_many, computed)
+            cached.update(computed)
+        
+        return [cached[key] for key in keys]
+    
+    async def embed_array(
+        self,
+        text: str | list[str],
+        model: Optional[str] = None,
+        normalize: bool = True,
+        dtype: type = np.float32,
+    ) -> np.ndarray:
+        """
+        Generate embeddings as a 2-D numpy array (one row per text).
+        
+        Rows are packed into a single contiguous array instead of a list of
+        Python float lists, which is what vector search wants.
+        
+        Args:
+            text: Single string or list of strings to embed
+            model: Embedding model name
+            normalize: L2-normalize each row (cosine similarity = dot product)
+            dtype: Output dtype (e.g. np.float16 to halve memory)
+            
+        Returns:
+            Array of shape (len(texts), dim)
+        """
+        vectors = np.asarray(await self.embed(text, model=model), dtype=np.float32)
+        if vectors.size == 0:
+            return vectors.reshape(0, 0).astype(dtype)
+        
+        if normalize:
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors /= np.maximum(norms, np.finfo(np.float32).tiny)
         
+        return vectors.astype(dtype, copy=False)
+    
+    async def _embed_uncached(
+        self,
+        texts: list[str],
+        model: str,
+        batch_size: Optional[int] = None,
+    ) -> list[list[float]]:
+        """Embed texts via Ollama, splitting into concurrent batches."""
+        batch_size = max(1, batch_size or settings.ollama_embed_batch_size)
+        
+        if len(texts) <= batch_size:
+            return await self._embed_batch(texts, model)
+        
+        semaphore = asyncio.Semaphore(max(1, settings.ollama_max_concurrent_embed_batches))
+        
+        async def _bounded(batch: list[str]) -> list[list[float]]:
+            async with semaphore:
+                return await self._embed_batch(batch, model)
+        
+        results = await asyncio.gather(*(
+            _bounded(texts[i:i + batch_size])
+            for i in range(0, len(texts), batch_size)
+        ))
+        
+        embeddings: list[list[float]] = []
+        for batch_embeddings in results:
+            embeddings.extend(batch_embeddings)
+        return embeddings
+    
+    async def _embed_batch(self, texts: list[str], model: str) -> list[list[float]]:
+        """Embed one batch of texts with a single /api/embed request."""
         payload = {
             "model": model,
             "input": texts,
+            "keep_alive": self._keep_alive(model),
         }
         
         try:
-            response = await self.client.post(
-                "/api/embed",
-                json=payload,
-            )
-            response.raise_for_status()
-            data = response.json()
-            return data.get("embeddings", [])
+            try:
+                data = await self._post_json("/api/embed", payload)
+            except httpx.HTTPStatusError as e:
+                # Ollama releases before 0.3 have no /api/embed
+                if e.response.status_code != 404:
+                    raise
+                data = {}
+            
+            if "embeddings" not in data:
+                return await self._embed_legacy(texts, model)
+            return data["embeddings"]
         except Exception as e:
-            raise RuntimeError(f"Embedding generation failed: {e}")
+            raise RuntimeError(f"Embedding generation failed: {e}") from e
+    
+    async def _embed_legacy(self, texts: list[str], model: str) -> list[list[float]]:
+        """Embed texts one request at a time via the legacy /api/embeddings."""
+        keep_alive = self._keep_alive(model)
+        embeddings = []
+        for t in texts:
+            data = await self._post_json(
+                "/api/embeddings",
+                {"model": model, "prompt": t, "keep_alive": keep_alive},
+            )
+            embeddings.append(data.get("embedding", []))
+        return embeddings
+
+
+def quantize_int8(vectors: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Quantize embedding rows to int8 with one scale per row.
+    
+    Dequantize with q.astype(np.float32) * scale[:, None]. For dot products
+    widen before multiplying, since an int8 matmul accumulates in int8 and
+    overflows: (q_a.astype(np.int32) @ q_b.T.astype(np.int32)) *
+    np.outer(scale_a, scale_b).
+    
+    Args:
+        vectors: Array of shape (n, dim)
+        
+    Returns:
+        (int8 array of shape (n, dim), float32 scales of shape (n,))
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    max_abs = np.abs(vectors).max(axis=1) if vectors.size else np.zeros(len(vectors), np.float32)
+    scale = np.where(max_abs > 0, max_abs / 127.0, 1.0).astype(np.float32)
+    quantized = np.rint(vectors / scale[:, None]).astype(np.int8)
+    return quantized, scale
+
+
+def _check_embedding_count(embeddings: list[list[float]], expected: int) -> list[list[float]]:
+    """Ensure Ollama returned one vector per input text."""
+    if len(embeddings) != expected:
+        raise RuntimeError(
+            f"Embedding generation failed: expected {expected} vectors, got {len(embeddings)}"
+        )
+    return embeddings
+
+
+# Background model warmup, started once per server by check_ollama_connection
+_warmed_base_urls: set[str] = set()
+_warmup_tasks: set[asyncio.Task] = set()
+
+
+def _schedule_model_warmup(base_url: str) -> None:
+    """Start loading the default models in the background (once per server)."""
+    if base_url in _warmed_base_urls:
+        return
+    _warmed_base_urls.add(base_url)
+    
+    task = asyncio.create_task(_warm_models(base_url))
+    # Hold a reference so the task is not garbage collected mid-flight
+    _warmup_tasks.add(task)
+    task.add_done_callback(_warmup_tasks.discard)
+
+
+async def _warm_models(base_url: str) -> None:
+    """
+    Load the default analysis and embedding models into memory.
+    
+    Overlaps the model cold start with UI/API startup so the first real
+    request does not pay for it. Failures (e.g. a model not pulled) are
+    ignored; the real request will report them.
+    """
+    async with OllamaClient(base_url=base_url) as client:
+        async def _load_analysis_model() -> None:
+            model = settings.default_analysis_model
+            # A generate request without a prompt only loads the model
+            with suppress(Exception):
+                await client._post_json(
+                    "/api/generate",
+                    {"model": model, "keep_alive": client._keep_alive(model)},
+                )
+        
+        async def _load_embedding_model() -> None:
+            with suppress(Exception):
+                await client.embed("warmup", use_cache=False)
+        
+        await asyncio.gather(_load_analysis_model(), _load_embedding_model())
+
+
+async def wait_for_model_warmup() -> None:
+    """
+    Wait for background model warmups started by check_ollama_connection.
+    
+    Useful in short-lived scripts, whose event loop would otherwise cancel
+    the warmup on exit before the models finish loading.
+    """
+    if _warmup_tasks:
+        await asyncio.gather(*_warmup_tasks, return_exceptions=True)
 
 
 # Convenience functions for module-level use
@@ -288,6 +771,8 @@ async def check_ollama_connection(base_url: Optional[str] = None) -> dict:
             connected = await client.is_connected()
             if connected:
                 models = await client.list_models()
+                if settings.ollama_warmup_on_connect:
+                    _schedule_model_warmup(client.base_url)
                 return {
                     "connected": True,
                     "message": f"Connected to Ollama. {len(models)} models available.",
@@ -305,17 +790,17 @@ async def check_ollama_connection(base_url: Optional[str] = None) -> dict:
         }
 
 
-async def list_available_models(base_url: Optional[str] = None) -> list[OllamaModel]:
+async def list_available_models(base_url: Optional[str] = None, refresh: bool = False) -> list[OllamaModel]:
     """List all available Ollama models."""
     async with OllamaClient(base_url=base_url) as client:
-        return await client.list_models()
+        return await client.list_models(refresh=refresh)
 
 
 async def generate_completion(
     prompt: str,
     model: Optional[str] = None,
     system: Optional[str] = None,
-    format: Optional[str] = None,
+    format: Optional[str | dict] = None,
     base_url: Optional[str] = None,
 ) -> str:
     """Generate a completion and return just the text."""
@@ -4,6 +4,7 @@ from app.services.parsing.chat_parser import (
     parse_chat_history,
     detect_chat_format,
     ChatExchange,
+    ChatColumns,
     ParsedChatHistory,
     ChatFormat,
 )
@@ -14,6 +15,7 @@ __all__ = [
     "detect_chat_format",
     "parse_essay",
     "ChatExchange",
+    "ChatColumns",
     "ParsedChatHistory",
     "ChatFormat",
     "ParsedEssay",
@@ -5,15 +5,70 @@ Extracts text from various document formats.
 Supports: TXT, DOCX, PDF, Markdown
 """
 
+import codecs
 import re
-from dataclasses import dataclass
+import threading
+import zipfile
+from dataclasses import dataclass, field
+from io import BytesIO
 from pathlib import Path
 from typing import Optional
+from xml.etree import ElementTree
 
-import chardet
 
+# Inline markdown elements; the named group holds the text to keep.
+# Single-star italic may not open or close next to whitespace or another
+# star, so a "* **Label:**" bullet is left to the bold branch. Bold closes
+# on the last star of a run, so "***x***" and "**a *b***" keep the inner
+# italic whole for the re-scan.
+_MD_INLINE = (
+    r"!\[(?P<img>[^\]]*)\]\([^\)]+\)"
+    r"|\[(?P<link>[^\]]+)\]\([^\)]+\)"
+    r"|`(?P<code>.+?)`"
+    r"|\*\*(?P<bold>.+?)\*\*(?!\*)"
+    r"|__(?P<ubold>.+?)__"
+    r"|(?<!\*)\*(?![\s*])(?P<italic>.+?)(?<![\s*])\*(?!\*)"
+    r"|_(?P<uitalic>.+?)_"
+)
+_MD_INLINE_RE = re.compile(_MD_INLINE)
 
-@dataclass
+# All markdown elements stripped from essays, matched in one scan.
+# Line-level markers (rules, headers, blockquotes) are removed outright.
+# They share one hoisted "^" so mid-line positions fail that branch with a
+# single check rather than one per alternative.
+_MD_RE = re.compile(
+    r"^(?:(?P<hr>[\-\*_]{3,}\s*$)"
+    r"|(?P<header>#{1,6}\s+)"
+    r"|(?P<quote>>\s*))"
+    r"|" + _MD_INLINE,
+    re.MULTILINE,
+)
+_MD_REMOVED_GROUPS = frozenset({"hr", "header", "quote"})
+
+# Whitespace normalisation for extracted text
+_WS_RUN_RE = re.compile(r" {2,}")
+_BLANK_RUN_RE = re.compile(r"\n{3,}")
+
+# WordprocessingML tags used when streaming DOCX text
+_W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_W_P = f"{_W_NS}p"
+_W_R = f"{_W_NS}r"
+_W_T = f"{_W_NS}t"
+_W_BR = f"{_W_NS}br"
+_W_HYPERLINK = f"{_W_NS}hyperlink"
+_W_TYPE = f"{_W_NS}type"
+_DOCX_RUN_CHARS = {
+    f"{_W_NS}tab": "\t",
+    f"{_W_NS}ptab": "\t",
+    f"{_W_NS}cr": "\n",
+    f"{_W_NS}noBreakHyphen": "-",
+}
+
+# PDFium is not thread-safe; parses running in worker threads take turns
+_PDFIUM_LOCK = threading.Lock()
+
+
+@dataclass(slots=True)
 class ParsedEssay:
     """Parsed essay with metadata."""
     text: str
@@ -21,11 +76,7 @@ class ParsedEssay:
     paragraph_count: int
     filename: Optional[str] = None
     file_format: str = "txt"
-    parsing_notes: list[str] = None
-    
-    def __post_init__(self):
-        if self.parsing_notes is None:
-            self.parsing_notes = []
+    parsing_notes: list[str] = field(default_factory=list)
     
     def to_dict(self) -> dict:
         """Convert to dictionary."""
@@ -74,8 +125,7 @@ def parse_essay(
     text = _clean_text(text)
     
     # Calculate stats
-    word_count = len(text.split())
-    paragraph_count = len([p for p in text.split("\n\n") if p.strip()])
+    word_count, paragraph_count = _text_stats(text)
     
     return ParsedEssay(
         text=text,
@@ -118,57 +168,148 @@ def _parse_text(content: bytes | str) -> str:
     if isinstance(content, str):
         return content
     
-    # Detect encoding
-    detected = chardet.detect(content)
-    encoding = detected.get("encoding", "utf-8") or "utf-8"
+    # Byte order marks identify the encoding outright
+    if content.startswith(codecs.BOM_UTF8):
+        return content.decode("utf-8-sig")
+    if content.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        try:
+            return content.decode("utf-16")
+        except UnicodeDecodeError:
+            pass
     
+    # Nearly all essays are UTF-8 (or plain ASCII), which decodes at C speed;
+    # statistical detection is only worth its cost when that fails
     try:
-        return content.decode(encoding)
+        return content.decode("utf-8")
     except UnicodeDecodeError:
-        # Fallback encodings
-        for enc in ["utf-8", "latin-1", "cp1252"]:
-            try:
-                return content.decode(enc)
-            except UnicodeDecodeError:
-                continue
-        
-        # Last resort: ignore errors
-        return content.decode("utf-8", errors="ignore")
+        pass
+    
+    # Windows-1252 covers most legacy Word/Notepad exports
+    try:
+        return content.decode("cp1252")
+    except UnicodeDecodeError:
+        pass
+    
+    # Imported here: chardet is a large pure-Python package that plain
+    # UTF-8/ASCII uploads never need
+    import chardet
+    
+    detected = chardet.detect(content)
+    encoding = detected.get("encoding")
+    if encoding:
+        try:
+            return content.decode(encoding)
+        except (UnicodeDecodeError, LookupError):
+            pass
+    
+    # Latin-1 maps every byte, so this cannot fail
+    return content.decode("latin-1")
 
 
 def _parse_docx(content: bytes) -> str:
-    """Extract text from DOCX file."""
+    """
+    Extract text from DOCX file.
+    
+    Streams word/document.xml straight out of the zip archive instead of
+    building a full python-docx object model. Text matches python-docx's
+    Document.paragraphs: body-level paragraphs only, with tabs and line
+    breaks inside a paragraph kept as characters.
+    """
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    
     try:
-        from docx import Document
-        from io import BytesIO
-        
-        if isinstance(content, str):
-            content = content.encode("utf-8")
-        
-        doc = Document(BytesIO(content))
-        
         paragraphs = []
-        for para in doc.paragraphs:
-            text = para.text.strip()
-            if text:
-                paragraphs.append(text)
+        depth = 0
+        
+        with zipfile.ZipFile(BytesIO(content)) as archive:
+            with archive.open("word/document.xml") as document:
+                for event, elem in ElementTree.iterparse(document, events=("start", "end")):
+                    if event == "start":
+                        depth += 1
+                        continue
+                    
+                    depth -= 1
+                    # Direct children of <w:body> sit at depth 2 once closed;
+                    # clear them as we go so memory stays flat
+                    if depth == 2:
+                        if elem.tag == _W_P:
+                            text = _docx_paragraph_text(elem).strip()
+                            if text:
+                                paragraphs.append(text)
+                        elem.clear()
         
         return "\n\n".join(paragraphs)
     
-    except ImportError:
-        raise ImportError("python-docx is required for DOCX parsing. Install with: pip install python-docx")
     except Exception as e:
         raise ValueError(f"Failed to parse DOCX: {e}")
 
 
+def _docx_paragraph_text(paragraph: ElementTree.Element) -> str:
+    """Text of a <w:p>, from its runs and hyperlinked runs."""
+    parts = []
+    for child in paragraph:
+        if child.tag == _W_R:
+            runs = (child,)
+        elif child.tag == _W_HYPERLINK:
+            runs = child.iterfind(_W_R)
+        else:
+            continue
+        
+        for run in runs:
+            for item in run:
+                tag = item.tag
+                if tag == _W_T:
+                    parts.append(item.text or "")
+                elif tag == _W_BR:
+                    # Page and column breaks carry no text
+                    if item.get(_W_TYPE, "textWrapping") == "textWrapping":
+                        parts.append("\n")
+                elif tag in _DOCX_RUN_CHARS:
+                    parts.append(_DOCX_RUN_CHARS[tag])
+    
+    return "".join(parts)
+
+
 def _parse_pdf(content: bytes) -> str:
-    """Extract text from PDF file."""
+    """
+    Extract text from PDF file.
+    
+    Uses pypdfium2 (native PDFium) when installed, otherwise pypdf.
+    """
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    
     try:
-        from pypdf import PdfReader
-        from io import BytesIO
+        import pypdfium2 as pdfium
+    except ImportError:
+        return _parse_pdf_pypdf(content)
+    
+    try:
+        with _PDFIUM_LOCK:
+            pdf = pdfium.PdfDocument(content)
+            try:
+                text_parts = []
+                for page in pdf:
+                    textpage = page.get_textpage()
+                    page_text = textpage.get_text_range()
+                    textpage.close()
+                    page.close()
+                    if page_text:
+                        text_parts.append(page_text)
+            finally:
+                pdf.close()
         
-        if isinstance(content, str):
-            content = content.encode("utf-8")
+        return "\n\n".join(text_parts)
+    
+    except Exception as e:
+        raise ValueError(f"Failed to parse PDF: {e}")
+
+
+def _parse_pdf_pypdf(content: bytes) -> str:
+    """Extract text from PDF file with pypdf."""
+    try:
+        from pypdf import PdfReader
         
         reader = PdfReader(BytesIO(content))
         
@@ -193,45 +334,50 @@ def _parse_markdown(content: bytes | str) -> str:
     """
     text = _parse_text(content) if isinstance(content, bytes) else content
     
-    # Remove common markdown elements while preserving text
-    
-    # Remove headers (keep the text)
-    text = re.sub(r"^#{1,6}\s+", "", text, flags=re.MULTILINE)
-    
-    # Remove bold/italic markers
-    text = re.sub(r"\*\*(.+?)\*\*", r"\1", text)
-    text = re.sub(r"\*(.+?)\*", r"\1", text)
-    text = re.sub(r"__(.+?)__", r"\1", text)
-    text = re.sub(r"_(.+?)_", r"\1", text)
-    
-    # Remove inline code
-    text = re.sub(r"`(.+?)`", r"\1", text)
-    
-    # Remove links but keep text
-    text = re.sub(r"\[([^\]]+)\]\([^\)]+\)", r"\1", text)
-    
-    # Remove images
-    text = re.sub(r"!\[([^\]]*)\]\([^\)]+\)", r"\1", text)
+    # Remove headers, emphasis, code, links, images, rules and blockquote
+    # markers in a single pass, keeping the text they wrap
+    return _MD_RE.sub(_strip_markdown_match, text)
+
+
+def _strip_markdown_match(match: re.Match) -> str:
+    """Replacement for one markdown element matched by _MD_RE."""
+    group = match.lastgroup
+    if group in _MD_REMOVED_GROUPS:
+        return ""
+    # Wrapped text may itself contain emphasis (e.g. **bold *italic***)
+    return _MD_INLINE_RE.sub(_strip_markdown_match, match.group(group))
+
+
+def _text_stats(text: str) -> tuple[int, int]:
+    """
+    Count words and non-blank paragraphs from a single paragraph split.
     
-    # Remove horizontal rules
-    text = re.sub(r"^[\-\*_]{3,}\s*$", "", text, flags=re.MULTILINE)
+    Words are counted per paragraph and summed; paragraph breaks are
+    whitespace, so the total equals len(text.split()).
+    """
+    word_count = 0
+    paragraph_count = 0
     
-    # Remove blockquote markers
-    text = re.sub(r"^>\s*", "", text, flags=re.MULTILINE)
+    for paragraph in text.split("\n\n"):
+        words = len(paragraph.split())
+        if words:
+            word_count += words
+            paragraph_count += 1
     
-    return text
+    return word_count, paragraph_count
 
 
 def _clean_text(text: str) -> str:
     """Clean up extracted text."""
     # Normalize line endings
-    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
     
-    # Remove excessive whitespace
-    text = re.sub(r" +", " ", text)
+    # Collapse runs of spaces (single spaces are left untouched)
+    text = _WS_RUN_RE.sub(" ", text)
     
     # Remove excessive blank lines (more than 2)
-    text = re.sub(r"\n{3,}", "\n\n", text)
+    text = _BLANK_RUN_RE.sub("\n\n", text)
     
     # Strip leading/trailing whitespace
     text = text.strip()
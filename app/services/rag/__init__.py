@@ -8,6 +8,7 @@ from app.services.rag.embeddings import (
     EmbeddingService,
     embed_chunks,
 )
+from app.services.rag.query_cache import SemanticQueryCache
 from app.services.rag.retriever import (
     Retriever,
     retrieve_relevant_chunks,
@@ -18,6 +19,7 @@ __all__ = [
     "ChatChunk",
     "EmbeddingService",
     "embed_chunks",
+    "SemanticQueryCache",
     "Retriever",
     "retrieve_relevant_chunks",
 ]
@@ -7,8 +7,11 @@ With optional context overlap from surrounding exchanges.
 """
 
 from dataclasses import dataclass, field
+from functools import cached_property
 from typing import Optional
 
+import numpy as np
+
 from app.services.parsing import ParsedChatHistory, ChatExchange
 
 
@@ -21,6 +24,9 @@ class ChatChunk:
     - The primary exchange (student prompt + AI response)
     - Optional context from previous/next exchanges
     - Metadata for citation and filtering
+    
+    The text properties are computed once and cached, so the prompt,
+    response and context must not be changed after construction.
     """
     chunk_id: str
     exchange_number: int  # 1-indexed exchange number
@@ -29,54 +35,65 @@ class ChatChunk:
     student_prompt: str
     ai_response: str
     
-    # Context (surrounding exchanges for better understanding)
-    context_before: list[ChatExchange] = field(default_factory=list)
-    context_after: list[ChatExchange] = field(default_factory=list)
+    # Context (surrounding exchanges for better understanding), as
+    # [start, end) index ranges into the history's shared exchange list
+    context_source: list[ChatExchange] = field(default_factory=list, repr=False, compare=False)
+    context_before_range: tuple[int, int] = (0, 0)
+    context_after_range: tuple[int, int] = (0, 0)
     
     # Metadata
     model_name: Optional[str] = None
     timestamp: Optional[str] = None
     char_count: int = 0
     
-    # Embedding (populated later)
-    embedding: Optional[list[float]] = None
+    # Embedding (populated later) as a contiguous float32 vector
+    embedding: Optional[np.ndarray] = None
     
     def __post_init__(self):
         if self.char_count == 0:
             self.char_count = len(self.student_prompt) + len(self.ai_response)
     
     @property
+    def context_before(self) -> list[ChatExchange]:
+        """Exchanges preceding the primary one."""
+        start, end = self.context_before_range
+        return self.context_source[start:end]
+    
+    @property
+    def context_after(self) -> list[ChatExchange]:
+        """Exchanges following the primary one."""
+        start, end = self.context_after_range
+        return self.context_source[start:end]
+    
+    @cached_property
     def primary_text(self) -> str:
         """Get the primary exchange text for embedding."""
         return f"Student: {self.student_prompt}\n\nAI Response: {self.ai_response}"
     
-    @property
+    @cached_property
     def full_text_with_context(self) -> str:
         """Get full text including context for comprehensive embedding."""
         parts = []
+        context_before = self.context_before
+        context_after = self.context_after
         
         # Add context before
-        if self.context_before:
+        if context_before:
             parts.append("=== Previous Context ===")
-            for ex in self.context_before:
-                parts.append(f"[Exchange {ex.number}]")
-                parts.append(f"Student: {ex.student_prompt[:500]}...")
-                parts.append(f"AI: {ex.ai_response[:500]}...")
+            parts.extend(map(_context_exchange_text, context_before))
             parts.append("")
         
         # Add primary exchange
-        parts.append(f"=== Exchange {self.exchange_number} (Primary) ===")
-        parts.append(f"Student: {self.student_prompt}")
-        parts.append(f"AI Response: {self.ai_response}")
+        parts.append(
+            f"=== Exchange {self.exchange_number} (Primary) ===\n"
+            f"Student: {self.student_prompt}\n"
+            f"AI Response: {self.ai_response}"
+        )
         
         # Add context after
-        if self.context_after:
-            parts.append("")
-            parts.append("=== Following Context ===")
-            for ex in self.context_after:
-                parts.append(f"[Exchange {ex.number}]")
-                parts.append(f"Student: {ex.student_prompt[:500]}...")
-                parts.append(f"AI: {ex.ai_response[:500]}...")
+        if context_after:
+            parts.append("\n=== Following Context ===")
+            parts.extend(map(_context_exchange_text, context_after))
         
         return "\n".join(parts)
     
@@ -96,11 +113,22 @@ class ChatChunk:
             "timestamp": self.timestamp,
             "char_count": self.char_count,
             "citation_ref": self.citation_ref,
-            "context_before_count": len(self.context_before),
-            "context_after_count": len(self.context_after),
+            "context_before_count": self.context_before_range[1] - self.context_before_range[0],
+            "context_after_count": self.context_after_range[1] - self.context_after_range[0],
+            "embedding_dim": len(self.embedding) if self.embedding is not None else 0,
+            "embedding_dtype": str(self.embedding.dtype) if self.embedding is not None else None,
         }
 
 
+def _context_exchange_text(exchange: ChatExchange) -> str:
+    """Render a context exchange, truncating each side to 500 characters."""
+    return (
+        f"[Exchange {exchange.number}]\n"
+        f"Student: {exchange.student_prompt[:500]}...\n"
+        f"AI: {exchange.ai_response[:500]}..."
+    )
+
+
 def chunk_chat_history(
     chat_history: ParsedChatHistory,
     context_window: int = 1,
@@ -122,26 +150,21 @@ def chunk_chat_history(
     chunks = []
     exchanges = chat_history.exchanges
     
+    window = max(0, context_window)
+    
     for i, exchange in enumerate(exchanges):
-        # Get context before
-        context_before = []
-        if context_window > 0:
-            start_idx = max(0, i - context_window)
-            context_before = exchanges[start_idx:i]
-        
-        # Get context after
-        context_after = []
-        if context_window > 0:
-            end_idx = min(len(exchanges), i + context_window + 1)
-            context_after = exchanges[i + 1:end_idx]
+        # Context is referenced by index range rather than copied per chunk
+        context_before = (max(0, i - window), i)
+        context_after = (i + 1, min(len(exchanges), i + window + 1))
         
         chunk = ChatChunk(
             chunk_id=f"chat_{chat_history.platform}_{exchange.number}",
             exchange_number=exchange.number,
             student_prompt=exchange.student_prompt,
             ai_response=exchange.ai_response,
-            context_before=context_before,
-            context_after=context_after,
+            context_source=exchanges,
+            context_before_range=context_before,
+            context_after_range=context_after,
             model_name=exchange.model_name,
             timestamp=exchange.timestamp,
         )
@@ -6,14 +6,21 @@ Generates embeddings for chat chunks using Ollama embedding models.
 
 import asyncio
 from dataclasses import dataclass
+from itertools import chain
 from typing import Optional
 
+import httpx
+import numpy as np
+
 from app.config import get_settings
 from app.services.ollama import OllamaClient
 from app.services.rag.chunker import ChatChunk, get_chunk_text_for_embedding
 
 settings = get_settings()
 
+# Upper bound on texts per embedding batch
+_MAX_BATCH_SIZE = 512
+
 
 @dataclass
 class EmbeddingResult:
@@ -43,15 +50,27 @@ class EmbeddingService:
     Or with context manager:
         async with EmbeddingService() as service:
             embeddings = await service.embed_texts(texts)
+    
+    batch_size defaults to OLLAMA_EMBED_BATCH_SIZE and max_concurrency to
+    OLLAMA_MAX_CONCURRENT_EMBED_BATCHES. The right values depend on the
+    model and hardware; the Ollama server's OLLAMA_NUM_PARALLEL (requests
+    served at once) and OLLAMA_MAX_LOADED_MODELS (models kept in memory)
+    bound what concurrency actually achieves.
     """
     
     def __init__(
         self,
         model: Optional[str] = None,
-        batch_size: int = 10,
+        batch_size: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
     ):
         self.model = model or settings.default_embedding_model
-        self.batch_size = batch_size
+        self.batch_size = min(
+            _MAX_BATCH_SIZE, max(1, batch_size or settings.ollama_embed_batch_size)
+        )
+        self.max_concurrency = max(
+            1, max_concurrency or settings.ollama_max_concurrent_embed_batches
+        )
         self._client: Optional[OllamaClient] = None
     
     async def __aenter__(self) -> "EmbeddingService":
@@ -108,6 +127,12 @@ class EmbeddingService:
         """
         Generate embeddings in batches to manage memory and rate limits.
         
+        Up to max_concurrency batches are in flight at once so Ollama is
+        never idle while the next request is being prepared. Raise
+        OLLAMA_NUM_PARALLEL on the Ollama server to let it actually run
+        that many requests in parallel. A batch that times out or gets a
+        5xx response is split in half and retried.
+        
         Args:
             texts: List of texts to embed
             show_progress: Whether to print progress
@@ -115,24 +140,49 @@ class EmbeddingService:
         Returns:
             List of embedding vectors
         """
-        all_embeddings = []
         total_batches = (len(texts) + self.batch_size - 1) // self.batch_size
+        semaphore = asyncio.Semaphore(self.max_concurrency)
         
-        for i in range(0, len(texts), self.batch_size):
-            batch = texts[i:i + self.batch_size]
-            batch_num = i // self.batch_size + 1
-            
-            if show_progress:
-                print(f"  Embedding batch {batch_num}/{total_batches}...")
-            
-            batch_embeddings = await self.embed_texts(batch)
-            all_embeddings.extend(batch_embeddings)
-            
-            # Small delay between batches to avoid overwhelming Ollama
-            if i + self.batch_size < len(texts):
-                await asyncio.sleep(0.1)
+        async def _embed_batch(batch_num: int, batch: list[str]) -> list[list[float]]:
+            async with semaphore:
+                if show_progress:
+                    print(f"  Embedding batch {batch_num}/{total_batches}...")
+                return await self._embed_splitting(batch, show_progress)
         
-        return all_embeddings
+        results = await asyncio.gather(*(
+            _embed_batch(i // self.batch_size + 1, texts[i:i + self.batch_size])
+            for i in range(0, len(texts), self.batch_size)
+        ))
+        
+        return list(chain.from_iterable(results))
+    
+    async def _embed_splitting(
+        self,
+        batch: list[str],
+        show_progress: bool = False,
+    ) -> list[list[float]]:
+        """Embed a batch, halving it while Ollama times out or returns 5xx."""
+        try:
+            return await self.embed_texts(batch)
+        except RuntimeError as e:
+            if len(batch) <= 1 or not _is_overloaded(e):
+                raise
+        
+        half = len(batch) // 2
+        if show_progress:
+            print(f"  Ollama overloaded; retrying with batch size {half}...")
+        
+        first = await self._embed_splitting(batch[:half], show_progress)
+        second = await self._embed_splitting(batch[half:], show_progress)
+        return first + second
+
+
+def _is_overloaded(error: BaseException) -> bool:
+    """Whether an embedding error was caused by a timeout or a 5xx response."""
+    cause = error.__cause__
+    if isinstance(cause, httpx.TimeoutException):
+        return True
+    return isinstance(cause, httpx.HTTPStatusError) and cause.response.status_code >= 500
 
 
 async def embed_chunks(
@@ -165,12 +215,21 @@ async def embed_chunks(
     if show_progress:
         print(f"Generating embeddings for {len(chunks)} chunks...")
     
+    # Embed each distinct text once; duplicate chunks share the vector
+    unique_texts = list(dict.fromkeys(texts))
+    
     async with EmbeddingService(model=model) as service:
-        embeddings = await service.embed_texts_batched(texts, show_progress=show_progress)
+        embeddings = await service.embed_texts_batched(unique_texts, show_progress=show_progress)
     
-    # Attach embeddings to chunks
-    for chunk, embedding in zip(chunks, embeddings):
-        chunk.embedding = embedding
+    # Attach embeddings to chunks as float32 arrays
+    by_text = {
+        text: np.asarray(embedding, dtype=np.float32)
+        for text, embedding in zip(unique_texts, embeddings)
+    }
+    for chunk, text in zip(chunks, texts):
+        embedding = by_text.get(text)
+        if embedding is not None:
+            chunk.embedding = embedding
     
     if show_progress:
         print(f"  Done! Generated {len(embeddings)} embeddings.")
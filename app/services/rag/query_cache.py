@@ -0,0 +1,159 @@
+"""
+Semantic Query Cache
+
+Remembers recent retrieval results so repeated or near-identical queries
+skip both the query embedding and the similarity search.
+
+Lookups happen in two steps:
+- Exact: the whitespace-normalized query text was seen before
+- Semantic: a cached query's embedding has cosine similarity >= threshold
+  with the new query's embedding
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+import numpy as np
+
+
+class SemanticQueryCache:
+    """
+    Bounded, TTL-limited cache of search results keyed by query.
+    
+    Cached query embeddings live in one preallocated float32 matrix, so a
+    semantic probe is a single matrix-vector product over at most
+    `capacity` rows. Entries only match lookups made with the same
+    search parameters (e.g. top_k and min_score).
+    
+    A cache belongs to one index: clear it whenever the indexed chunks
+    change, otherwise it will return results from the old chunk set.
+    
+    Usage:
+        cache = SemanticQueryCache(threshold=0.95)
+        results = cache.get(query, params) or cache.get_similar(embedding, params)
+        if results is None:
+            results = search(...)
+            cache.put(query, embedding, params, results)
+    """
+    
+    def __init__(
+        self,
+        threshold: float = 0.95,
+        capacity: int = 1000,
+        ttl: float = 600.0,
+    ):
+        self.threshold = threshold
+        self.capacity = max(1, capacity)
+        self.ttl = ttl
+        
+        # query key -> slot, in least- to most-recently-used order
+        self._slots: OrderedDict[tuple, int] = OrderedDict()
+        self._free: list[int] = list(range(self.capacity - 1, -1, -1))
+        
+        # Per-slot storage; the embedding matrix is allocated on first put
+        self._vectors: Optional[np.ndarray] = None
+        self._expires = np.zeros(self.capacity, dtype=np.float64)
+        self._params: list[Any] = [None] * self.capacity
+        self._keys: list[Optional[tuple]] = [None] * self.capacity
+        self._results: list[Optional[list]] = [None] * self.capacity
+    
+    def __len__(self) -> int:
+        return len(self._slots)
+    
+    @staticmethod
+    def _key(query: str, params: Any) -> tuple:
+        return (" ".join(query.split()), params)
+    
+    def get(self, query: str, params: Any = None) -> Optional[list]:
+        """Return cached results for the same query text, if still fresh."""
+        slot = self._slots.get(self._key(query, params))
+        if slot is None:
+            return None
+        
+        if self._expires[slot] <= time.monotonic():
+            self._evict(slot)
+            return None
+        
+        self._slots.move_to_end(self._keys[slot])
+        return list(self._results[slot])
+    
+    def get_similar(self, embedding: list[float] | np.ndarray, params: Any = None) -> Optional[list]:
+        """Return cached results for the closest cached query above threshold."""
+        if not self._slots or self._vectors is None:
+            return None
+        
+        query = _unit(embedding)
+        if query is None or query.shape[0] != self._vectors.shape[1]:
+            return None
+        
+        # Rows of empty or expired slots score -inf
+        scores = self._vectors @ query
+        scores[self._expires <= time.monotonic()] = -np.inf
+        
+        for slot in np.argsort(-scores):
+            if scores[slot] < self.threshold:
+                return None
+            if self._params[slot] == params:
+                self._slots.move_to_end(self._keys[slot])
+                return list(self._results[slot])
+        
+        return None
+    
+    def put(
+        self,
+        query: str,
+        embedding: list[float] | np.ndarray,
+        params: Any,
+        results: list,
+    ) -> None:
+        """Cache the results of a search, evicting the least recently used entry."""
+        vector = _unit(embedding)
+        if vector is None:
+            return
+        
+        if self._vectors is None or self._vectors.shape[1] != vector.shape[0]:
+            # First entry, or the embedding model changed dimension
+            self.clear()
+            self._vectors = np.zeros((self.capacity, vector.shape[0]), dtype=np.float32)
+        
+        key = self._key(query, params)
+        slot = self._slots.get(key)
+        if slot is None:
+            if not self._free:
+                self._evict(next(iter(self._slots.values())))
+            slot = self._free.pop()
+            self._slots[key] = slot
+        else:
+            self._slots.move_to_end(key)
+        
+        self._vectors[slot] = vector
+        self._expires[slot] = time.monotonic() + self.ttl
+        self._params[slot] = params
+        self._keys[slot] = key
+        self._results[slot] = list(results)
+    
+    def clear(self) -> None:
+        """Drop every cached entry."""
+        for slot in list(self._slots.values()):
+            self._evict(slot)
+    
+    def _evict(self, slot: int) -> None:
+        del self._slots[self._keys[slot]]
+        self._expires[slot] = 0.0
+        self._params[slot] = None
+        self._keys[slot] = None
+        self._results[slot] = None
+        self._free.append(slot)
+
+
+def _unit(embedding: list[float] | np.ndarray) -> Optional[np.ndarray]:
+    """Embedding as a float32 unit vector, or None if it is empty or zero."""
+    vector = np.asarray(embedding, dtype=np.float32)
+    if vector.ndim != 1 or vector.size == 0:
+        return None
+    
+    norm = np.linalg.norm(vector)
+    if norm == 0:
+        return None
+    return vector / norm
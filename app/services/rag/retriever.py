@@ -6,11 +6,15 @@ Uses in-memory vector similarity for MVP (can upgrade to ChromaDB later).
 """
 
 import math
+import operator
 from dataclasses import dataclass, field
 from typing import Optional
 
+import numpy as np
+
 from app.services.rag.chunker import ChatChunk
 from app.services.rag.embeddings import embed_query
+from app.services.rag.query_cache import SemanticQueryCache
 
 
 @dataclass
@@ -32,7 +36,10 @@ class RetrievalResult:
         }
 
 
-def cosine_similarity(vec1: list[float], vec2: list[float]) -> float:
+def cosine_similarity(
+    vec1: list[float] | np.ndarray,
+    vec2: list[float] | np.ndarray,
+) -> float:
     """
     Calculate cosine similarity between two vectors.
     
@@ -43,12 +50,19 @@ def cosine_similarity(vec1: list[float], vec2: list[float]) -> float:
     Returns:
         Cosine similarity (0 to 1)
     """
-    if not vec1 or not vec2:
+    if len(vec1) == 0 or len(vec2) == 0:
         return 0.0
     
-    dot_product = sum(a * b for a, b in zip(vec1, vec2))
-    magnitude1 = math.sqrt(sum(a * a for a in vec1))
-    magnitude2 = math.sqrt(sum(b * b for b in vec2))
+    if isinstance(vec1, np.ndarray) or isinstance(vec2, np.ndarray):
+        a = np.asarray(vec1, dtype=np.float32)
+        b = np.asarray(vec2, dtype=np.float32)
+        magnitude = float(np.linalg.norm(a) * np.linalg.norm(b))
+        return float(a @ b) / magnitude if magnitude else 0.0
+    
+    # map/hypot keep the per-element work in C
+    dot_product = sum(map(operator.mul, vec1, vec2))
+    magnitude1 = math.hypot(*vec1)
+    magnitude2 = math.hypot(*vec2)
     
     if magnitude1 == 0 or magnitude2 == 0:
         return 0.0
@@ -56,6 +70,81 @@ def cosine_similarity(vec1: list[float], vec2: list[float]) -> float:
     return dot_product / (magnitude1 * magnitude2)
 
 
+class ChunkStore:
+    """
+    Structure-of-arrays index over chunk embeddings.
+    
+    Embeddings are stored L2-normalized as rows of one growable float32
+    buffer (capacity doubles on overflow), so cosine scoring is a single
+    matrix-vector product over contiguous memory with no per-row
+    division. Original magnitudes are not kept (cosine does not need
+    them; chunk.embedding itself is left untouched). The ChatChunk
+    objects are only touched to materialize results.
+    """
+    
+    def __init__(self, capacity: int = 64):
+        self.chunks: list[ChatChunk] = []
+        self._initial_capacity = max(1, capacity)
+        self._embeddings: Optional[np.ndarray] = None
+    
+    def __len__(self) -> int:
+        return len(self.chunks)
+    
+    @property
+    def embeddings(self) -> np.ndarray:
+        """(N, D) view of the stored unit-length embeddings."""
+        if self._embeddings is None:
+            return np.empty((0, 0), dtype=np.float32)
+        return self._embeddings[:len(self.chunks)]
+    
+    def add(self, chunks: list[ChatChunk]) -> None:
+        """Append chunks; every chunk must have a non-empty embedding."""
+        if not chunks:
+            return
+        
+        rows = np.stack([chunk.embedding for chunk in chunks]).astype(np.float32, copy=False)
+        start = len(self.chunks)
+        end = start + len(rows)
+        
+        if self._embeddings is None:
+            self._resize(max(self._initial_capacity, end), rows.shape[1])
+        elif rows.shape[1] != self._embeddings.shape[1]:
+            raise ValueError(
+                f"Embedding dimension {rows.shape[1]} does not match "
+                f"index dimension {self._embeddings.shape[1]}"
+            )
+        elif end > len(self._embeddings):
+            self._resize(max(end, 2 * len(self._embeddings)), rows.shape[1])
+        
+        # Zero vectors stay zero and so always score 0
+        norms = np.linalg.norm(rows, axis=1, keepdims=True)
+        self._embeddings[start:end] = rows / np.where(norms > 0, norms, 1.0)
+        self.chunks.extend(chunks)
+    
+    def clear(self) -> None:
+        """Remove all stored chunks."""
+        self.chunks = []
+        self._embeddings = None
+    
+    def scores(self, query_embedding: list[float] | np.ndarray) -> np.ndarray:
+        """Cosine similarity of the query against every stored embedding."""
+        query = np.asarray(query_embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return np.zeros(len(self.chunks), dtype=np.float32)
+        return self.embeddings @ (query / norm)
+    
+    def _resize(self, capacity: int, dim: int) -> None:
+        """Move the stored rows into buffers with room for `capacity` rows."""
+        embeddings = np.empty((capacity, dim), dtype=np.float32)
+        
+        count = len(self.chunks)
+        if self._embeddings is not None:
+            embeddings[:count] = self._embeddings[:count]
+        
+        self._embeddings = embeddings
+
+
 class Retriever:
     """
     In-memory retriever for chat chunks.
@@ -63,15 +152,35 @@ class Retriever:
     For MVP, stores chunks in memory with their embeddings.
     Can be upgraded to ChromaDB or FAISS for production.
     
+    Pass query_cache_threshold to reuse results for repeated queries and
+    for queries whose embedding is at least that cosine-similar to an
+    earlier one (an approximation; 0.95 is a reasonable value).
+    
     Usage:
         retriever = Retriever()
         retriever.add_chunks(chunks)
         results = await retriever.search("query about critical thinking", top_k=5)
     """
     
-    def __init__(self, embedding_model: Optional[str] = None):
-        self.chunks: list[ChatChunk] = []
+    def __init__(
+        self,
+        embedding_model: Optional[str] = None,
+        query_cache_threshold: Optional[float] = None,
+    ):
         self.embedding_model = embedding_model
+        self._query_cache = (
+            SemanticQueryCache(threshold=query_cache_threshold)
+            if query_cache_threshold is not None
+            else None
+        )
+        
+        # Scoring index; holds exactly the chunks that have embeddings
+        self._store = ChunkStore()
+    
+    @property
+    def chunks(self) -> list[ChatChunk]:
+        """Indexed chunks, in insertion order."""
+        return self._store.chunks
     
     def add_chunks(self, chunks: list[ChatChunk]) -> None:
         """
@@ -80,13 +189,24 @@ class Retriever:
         Args:
             chunks: List of ChatChunk objects with embeddings
         """
-        # Filter out chunks without embeddings
-        valid_chunks = [c for c in chunks if c.embedding is not None]
-        self.chunks.extend(valid_chunks)
+        # Filter out chunks without embeddings once, here, so scoring never
+        # has to skip missing or empty vectors
+        valid_chunks = [
+            c for c in chunks
+            if c.embedding is not None and len(c.embedding)
+        ]
+        self._store.add(valid_chunks)
+        self._invalidate()
     
     def clear(self) -> None:
         """Clear all indexed chunks."""
-        self.chunks = []
+        self._store.clear()
+        self._invalidate()
+    
+    def _invalidate(self) -> None:
+        """Forget cached results after the chunks change."""
+        if self._query_cache is not None:
+            self._query_cache.clear()
     
     async def search(
         self,
@@ -108,32 +228,28 @@ class Retriever:
         if not self.chunks:
             return []
         
+        cache = self._query_cache
+        params = (top_k, min_score)
+        if cache is not None:
+            cached = cache.get(query, params)
+            if cached is not None:
+                return cached
+        
         # Generate query embedding
         query_embedding = await embed_query(query, model=self.embedding_model)
         
         if not query_embedding:
             return []
         
-        # Calculate similarity for all chunks
-        scored_chunks = []
-        for chunk in self.chunks:
-            if chunk.embedding:
-                score = cosine_similarity(query_embedding, chunk.embedding)
-                if score >= min_score:
-                    scored_chunks.append((chunk, score))
+        if cache is not None:
+            cached = cache.get_similar(query_embedding, params)
+            if cached is not None:
+                return cached
         
-        # Sort by score descending
-        scored_chunks.sort(key=lambda x: x[1], reverse=True)
-        
-        # Take top-k
-        results = []
-        for rank, (chunk, score) in enumerate(scored_chunks[:top_k], 1):
-            results.append(RetrievalResult(
-                chunk=chunk,
-                score=score,
-                rank=rank,
-            ))
+        results = self.search_by_embedding(query_embedding, top_k=top_k, min_score=min_score)
         
+        if cache is not None:
+            cache.put(query, query_embedding, params, results)
         return results
     
     def search_by_embedding(
@@ -153,27 +269,33 @@ class Retriever:
         Returns:
             List of RetrievalResult
         """
-        if not self.chunks or not query_embedding:
+        store = self._store
+        if not store or len(query_embedding) == 0:
             return []
         
-        scored_chunks = []
-        for chunk in self.chunks:
-            if chunk.embedding:
-                score = cosine_similarity(query_embedding, chunk.embedding)
-                if score >= min_score:
-                    scored_chunks.append((chunk, score))
+        # Cosine similarity against every chunk in one matrix-vector product
+        scores = store.scores(query_embedding)
         
-        scored_chunks.sort(key=lambda x: x[1], reverse=True)
+        candidates = np.flatnonzero(scores >= min_score)
+        if 0 < top_k < len(candidates):
+            # Keep only candidates scoring at least the k-th best (O(N)), so
+            # the sort below covers about top_k elements instead of all N
+            candidate_scores = scores[candidates]
+            cut = len(candidates) - top_k
+            kth_best = np.partition(candidate_scores, cut)[cut]
+            candidates = candidates[candidate_scores >= kth_best]
         
-        results = []
-        for rank, (chunk, score) in enumerate(scored_chunks[:top_k], 1):
-            results.append(RetrievalResult(
-                chunk=chunk,
-                score=score,
-                rank=rank,
-            ))
+        # Sort by score descending (stable, so ties keep insertion order)
+        ranked = candidates[np.argsort(-scores[candidates], kind="stable")][:top_k]
         
-        return results
+        return [
+            RetrievalResult(
+                chunk=store.chunks[i],
+                score=float(scores[i]),
+                rank=rank,
+            )
+            for rank, i in enumerate(ranked, 1)
+        ]
     
     def get_chunks_by_exchange(self, exchange_numbers: list[int]) -> list[ChatChunk]:
         """
@@ -266,16 +388,17 @@ def format_retrieved_for_prompt(
     for result in results:
         chunk = result.chunk
         
-        # Truncate if needed
+        # Truncate if needed, splitting the budget between prompt and response
         prompt = chunk.student_prompt
         response = chunk.ai_response
+        prompt_len = len(prompt)
+        response_len = len(response)
         
-        if len(prompt) + len(response) > max_chars_per_chunk:
-            # Split budget between prompt and response
+        if prompt_len + response_len > max_chars_per_chunk:
             budget = max_chars_per_chunk // 2
-            if len(prompt) > budget:
+            if prompt_len > budget:
                 prompt = prompt[:budget] + "..."
-            if len(response) > budget:
+            if response_len > budget:
                 response = response[:budget] + "..."
         
         parts.append(f"""
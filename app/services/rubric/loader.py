@@ -7,11 +7,49 @@ Can load from file or create programmatically.
 
 import re
 from dataclasses import dataclass, field
+from functools import cache, lru_cache
 from pathlib import Path
 from typing import Optional
 
 import orjson
 
+# Rubric markdown patterns, compiled once at import
+_TITLE_RE = re.compile(r"^#\s+(.+?)$", re.MULTILINE)
+_DESC_RE = re.compile(r"^##\s+(?:A )?(.+?)$", re.MULTILINE)
+# The "## Grading Rubric" section runs until the next level-2 heading.
+# Its end is located with str.find plus an anchored match: a lazy DOTALL
+# body with a MULTILINE lookahead re-tests every character.
+_RUBRIC_SECTION_RE = re.compile(r"##\s+Grading Rubric\s*\n")
+_SECTION_END_RE = re.compile(r"##\s+[^#]")
+# Category headers like "### 1. AI Collaboration Process (50 points)" and
+# criterion headers like "#### Starting Point & Initial Thinking (10 points)",
+# matched in one scan. A criterion name may not start with "###", so an
+# empty "####" line cannot swallow the category header after it.
+_HEADING_RE = re.compile(
+    r"^###\s+(?P<cat_order>\d+)\.\s+(?P<cat_name>.+?)\s+\((?P<cat_points>\d+)\s+points?\)"
+    r"|^####\s+(?P<crit_name>(?!###).+?)\s+\((?P<crit_points>\d+)\s+points?\)",
+    re.MULTILINE | re.IGNORECASE
+)
+_TABLE_RE = re.compile(
+    r"\|[^\n]+\|\s*\n\|[\-\|]+\|\s*\n(\|[^\n]+\|)",
+    re.DOTALL
+)
+_HEADER_RE = re.compile(r"^\|(.+)\|", re.MULTILINE)
+_RANGE_RE = re.compile(r"\((\d+)[-–](\d+)\)")
+
+# Standard scoring levels, best first; a level's index is its order
+_LEVEL_NAMES = ("exemplary", "proficient", "developing", "inadequate")
+_DEFAULT_LEVEL_DESCRIPTIONS = tuple(f"{name.title()} performance" for name in _LEVEL_NAMES)
+
+# Default (min, max) points per level for criteria worth up to 5, 7, 10
+# and 15 points
+_LEVEL_RANGES = (
+    ((5, 5), (4, 4), (2, 3), (0, 1)),
+    ((6, 7), (5, 5), (3, 4), (0, 2)),
+    ((9, 10), (7, 8), (5, 6), (0, 4)),
+    ((14, 15), (11, 13), (8, 10), (0, 7)),
+)
+
 
 @dataclass
 class LevelData:
@@ -72,13 +110,21 @@ class CategoryData:
 
 @dataclass
 class RubricData:
-    """Complete rubric structure."""
+    """
+    Complete rubric structure.
+    
+    Compact JSON output is cached on first use, so finish building the
+    rubric before serializing it.
+    """
     name: str
     description: str
     version: str
     total_points: int
     categories: list[CategoryData] = field(default_factory=list)
     
+    # Compact serialized form, filled in by to_json (orjson skips "_" fields)
+    _json: Optional[bytes] = field(default=None, init=False, repr=False, compare=False)
+    
     def to_dict(self) -> dict:
         return {
             "name": self.name,
@@ -88,8 +134,23 @@ class RubricData:
             "categories": [c.to_dict() for c in self.categories],
         }
     
-    def to_json(self) -> str:
-        return orjson.dumps(self.to_dict(), option=orjson.OPT_INDENT_2).decode("utf-8")
+    def to_json(self, pretty: bool = False) -> str:
+        return self.to_json_bytes(pretty=pretty).decode("utf-8")
+    
+    def to_json_bytes(self, pretty: bool = False) -> bytes:
+        """
+        UTF-8 JSON, ready to send as a response body without re-encoding.
+        
+        Args:
+            pretty: Indent the output (for files and debugging; not cached)
+        """
+        # orjson serializes the dataclass tree natively (fields in
+        # declaration order), without building the to_dict() tree
+        if pretty:
+            return orjson.dumps(self, option=orjson.OPT_INDENT_2)
+        if self._json is None:
+            self._json = orjson.dumps(self)
+        return self._json
 
 
 def load_rubric_from_markdown(file_path: str | Path) -> RubricData:
@@ -97,9 +158,25 @@ def load_rubric_from_markdown(file_path: str | Path) -> RubricData:
     Load rubric from markdown file.
     
     This parser is specifically designed for the rubric.md format.
+    
+    Parsed rubrics are cached by path, modification time and size, so
+    repeated loads of an unchanged file skip the read and the parse. The
+    same RubricData object is returned each time; don't mutate it.
     """
-    path = Path(file_path)
-    content = path.read_text(encoding="utf-8")
+    path = Path(file_path).absolute()
+    stat = path.stat()
+    
+    return _load_rubric_cached(str(path), stat.st_mtime_ns, stat.st_size)
+
+
+@lru_cache(maxsize=8)
+def _load_rubric_cached(path: str, mtime_ns: int, size: int) -> RubricData:
+    """Read and parse a rubric file (mtime_ns and size only key the cache)."""
+    content = Path(path).read_bytes().decode("utf-8")
+    
+    # Normalize newlines as read_text() would
+    if "\r" in content:
+        content = content.replace("\r\n", "\n").replace("\r", "\n")
     
     return parse_rubric_markdown(content)
 
@@ -117,11 +194,11 @@ def parse_rubric_markdown(content: str) -> RubricData:
     """
     
     # Extract title
-    title_match = re.search(r"^#\s+(.+?)$", content, re.MULTILINE)
+    title_match = _TITLE_RE.search(content)
     title = title_match.group(1) if title_match else "AI-Assisted Writing Rubric"
     
     # Extract description (usually the Philosophy section or subtitle)
-    desc_match = re.search(r"^##\s+(?:A )?(.+?)$", content, re.MULTILINE)
+    desc_match = _DESC_RE.search(content)
     description = desc_match.group(1) if desc_match else "Process-focused assessment rubric"
     
     categories = _parse_categories(content)
@@ -139,86 +216,67 @@ def parse_rubric_markdown(content: str) -> RubricData:
 
 
 def _parse_categories(content: str) -> list[CategoryData]:
-    """Extract categories from rubric markdown."""
-    categories = []
+    """Extract categories, and the criteria under each, from rubric markdown."""
+    categories: list[CategoryData] = []
     
     # Find the grading rubric section
-    rubric_section_match = re.search(
-        r"##\s+Grading Rubric\s*\n(.*?)(?=^##\s+[^#]|\Z)",
-        content,
-        re.MULTILINE | re.DOTALL
-    )
+    rubric_section = _find_rubric_section(content)
     
-    if not rubric_section_match:
+    if rubric_section is None:
         # Try alternative: find sections starting with "### 1."
         rubric_section = content
-    else:
-        rubric_section = rubric_section_match.group(1)
-    
-    # Pattern for category headers like "### 1. AI Collaboration Process (50 points)"
-    category_pattern = re.compile(
-        r"^###\s+(\d+)\.\s+(.+?)\s+\((\d+)\s+points?\)",
-        re.MULTILINE | re.IGNORECASE
-    )
-    
-    # Find all categories
-    category_matches = list(category_pattern.finditer(rubric_section))
     
-    for i, match in enumerate(category_matches):
-        order = int(match.group(1))
-        name = match.group(2).strip()
-        weight = int(match.group(3))
+    # One pass over all category and criterion headers, in document order
+    headings = list(_HEADING_RE.finditer(rubric_section))
+    
+    for i, match in enumerate(headings):
+        if match.group("cat_order") is not None:
+            categories.append(CategoryData(
+                name=match.group("cat_name").strip(),
+                weight=int(match.group("cat_points")),
+                order=int(match.group("cat_order")) - 1,  # 0-indexed
+            ))
+            continue
         
-        # Get content until next category or end
-        start = match.end()
-        end = category_matches[i + 1].start() if i + 1 < len(category_matches) else len(rubric_section)
-        category_content = rubric_section[start:end]
+        # Criteria before the first category belong to none
+        if not categories:
+            continue
         
-        # Parse criteria within this category
-        criteria = _parse_criteria(category_content)
+        # Criterion content runs until the next header or the end
+        end = headings[i + 1].start() if i + 1 < len(headings) else len(rubric_section)
+        criterion_content = rubric_section[match.end():end]
+        points = int(match.group("crit_points"))
         
-        categories.append(CategoryData(
-            name=name,
-            weight=weight,
-            criteria=criteria,
-            order=order - 1,  # 0-indexed
+        criteria = categories[-1].criteria
+        criteria.append(CriterionData(
+            name=match.group("crit_name").strip(),
+            points=points,
+            levels=_parse_levels_from_table(criterion_content, points),
+            order=len(criteria),
         ))
     
     return categories
 
 
-def _parse_criteria(category_content: str) -> list[CriterionData]:
-    """Extract criteria from category content."""
-    criteria = []
-    
-    # Pattern for criterion headers like "#### Starting Point & Initial Thinking (10 points)"
-    criterion_pattern = re.compile(
-        r"^####\s+(.+?)\s+\((\d+)\s+points?\)",
-        re.MULTILINE | re.IGNORECASE
-    )
-    
-    criterion_matches = list(criterion_pattern.finditer(category_content))
+def _find_rubric_section(content: str) -> Optional[str]:
+    """Return the body of the "## Grading Rubric" section, if present."""
+    if "Grading Rubric" not in content:
+        return None
     
-    for i, match in enumerate(criterion_matches):
-        name = match.group(1).strip()
-        points = int(match.group(2))
-        
-        # Get content until next criterion or end
-        start = match.end()
-        end = criterion_matches[i + 1].start() if i + 1 < len(criterion_matches) else len(category_content)
-        criterion_content = category_content[start:end]
-        
-        # Parse levels from the table
-        levels = _parse_levels_from_table(criterion_content, points)
-        
-        criteria.append(CriterionData(
-            name=name,
-            points=points,
-            levels=levels,
-            order=i,
-        ))
-    
-    return criteria
+    header_match = _RUBRIC_SECTION_RE.search(content)
+    if not header_match:
+        return None
+    
+    # The header ends with a newline, so every line start after it
+    # follows a "\n" at or past header_match.end() - 1
+    start = header_match.end()
+    pos = content.find("\n##", start - 1)
+    while pos != -1:
+        if _SECTION_END_RE.match(content, pos + 1):
+            return content[start:pos + 1]
+        pos = content.find("\n##", pos + 1)
+    
+    return content[start:]
 
 
 def _parse_levels_from_table(criterion_content: str, max_points: int) -> list[LevelData]:
@@ -233,31 +291,27 @@ def _parse_levels_from_table(criterion_content: str, max_points: int) -> list[Le
     levels = []
     
     # Find the table
-    table_match = re.search(
-        r"\|[^\n]+\|\s*\n\|[\-\|]+\|\s*\n(\|[^\n]+\|)",
-        criterion_content,
-        re.DOTALL
-    )
+    table_match = _TABLE_RE.search(criterion_content)
     
     if not table_match:
         # Create default levels if no table found
         return _create_default_levels(max_points)
     
     # Parse header row for level names and point ranges
-    header_match = re.search(r"^\|(.+)\|", criterion_content, re.MULTILINE)
+    header_match = _HEADER_RE.search(criterion_content)
     if not header_match:
         return _create_default_levels(max_points)
     
-    headers = header_match.group(1).split("|")
-    headers = [h.strip() for h in headers if h.strip()]
+    headers = _split_table_row(header_match.group(1))
     
     # Parse description row
     lines = criterion_content.strip().split("\n")
     desc_line = None
     for line in lines:
         if line.startswith("|") and "---" not in line:
-            # Skip the header row
-            if any("Exemplary" in h or "Proficient" in h for h in line.split("|")):
+            # Skip the header row (no cell contains "|", so checking the
+            # whole line is the same as checking each cell)
+            if "Exemplary" in line or "Proficient" in line:
                 continue
             desc_line = line
             break
@@ -265,24 +319,15 @@ def _parse_levels_from_table(criterion_content: str, max_points: int) -> list[Le
     if not desc_line:
         return _create_default_levels(max_points)
     
-    descriptions = desc_line.split("|")
-    descriptions = [d.strip() for d in descriptions if d.strip()]
+    descriptions = _split_table_row(desc_line)
     
-    # Standard level definitions
-    level_defs = [
-        ("exemplary", 0),
-        ("proficient", 1),
-        ("developing", 2),
-        ("inadequate", 3),
-    ]
-    
-    for i, (level_name, order) in enumerate(level_defs):
-        if i >= len(headers):
+    for order, level_name in enumerate(_LEVEL_NAMES):
+        if order >= len(headers):
             break
         
         # Extract point range from header like "Exemplary (9-10)" or "Inadequate (0-4)"
-        header = headers[i]
-        range_match = re.search(r"\((\d+)[-–](\d+)\)", header)
+        header = headers[order]
+        range_match = _RANGE_RE.search(header)
         
         if range_match:
             min_pts = int(range_match.group(1))
@@ -291,7 +336,7 @@ def _parse_levels_from_table(criterion_content: str, max_points: int) -> list[Le
             # Estimate based on position
             min_pts, max_pts = _estimate_point_range(order, max_points)
         
-        description = descriptions[i] if i < len(descriptions) else ""
+        description = descriptions[order] if order < len(descriptions) else ""
         
         levels.append(LevelData(
             name=level_name,
@@ -304,49 +349,52 @@ def _parse_levels_from_table(criterion_content: str, max_points: int) -> list[Le
     return levels
 
 
+def _split_table_row(row: str) -> list[str]:
+    """Split a markdown table row into its stripped, non-empty cells."""
+    return [stripped for cell in row.split("|") if (stripped := cell.strip())]
+
+
+def _level_ranges(max_points: int) -> tuple[tuple[int, int], ...]:
+    """Default level point ranges for a criterion worth max_points."""
+    if max_points <= 5:
+        return _LEVEL_RANGES[0]
+    if max_points <= 7:
+        return _LEVEL_RANGES[1]
+    if max_points <= 10:
+        return _LEVEL_RANGES[2]
+    return _LEVEL_RANGES[3]  # 15 points
+
+
 def _estimate_point_range(order: int, max_points: int) -> tuple[int, int]:
     """Estimate point range based on level order and max points."""
-    if max_points <= 5:
-        ranges = {0: (5, 5), 1: (4, 4), 2: (2, 3), 3: (0, 1)}
-    elif max_points <= 7:
-        ranges = {0: (6, 7), 1: (5, 5), 2: (3, 4), 3: (0, 2)}
-    elif max_points <= 10:
-        ranges = {0: (9, 10), 1: (7, 8), 2: (5, 6), 3: (0, 4)}
-    else:  # 15 points
-        ranges = {0: (14, 15), 1: (11, 13), 2: (8, 10), 3: (0, 7)}
-    
-    return ranges.get(order, (0, max_points))
+    ranges = _level_ranges(max_points)
+    return ranges[order] if 0 <= order < len(ranges) else (0, max_points)
 
 
 def _create_default_levels(max_points: int) -> list[LevelData]:
     """Create default levels when table parsing fails."""
-    if max_points <= 5:
-        ranges = [(5, 5), (4, 4), (2, 3), (0, 1)]
-    elif max_points <= 7:
-        ranges = [(6, 7), (5, 5), (3, 4), (0, 2)]
-    elif max_points <= 10:
-        ranges = [(9, 10), (7, 8), (5, 6), (0, 4)]
-    else:
-        ranges = [(14, 15), (11, 13), (8, 10), (0, 7)]
-    
-    level_names = ["exemplary", "proficient", "developing", "inadequate"]
+    ranges = _level_ranges(max_points)
     
     return [
         LevelData(
             name=name,
             min_points=ranges[i][0],
             max_points=ranges[i][1],
-            description=f"{name.title()} performance",
+            description=_DEFAULT_LEVEL_DESCRIPTIONS[i],
             order=i,
         )
-        for i, name in enumerate(level_names)
+        for i, name in enumerate(_LEVEL_NAMES)
     ]
 
 
+@cache
 def create_default_rubric() -> RubricData:
     """
     Create the default rubric programmatically.
     This matches the structure in rubric.md.
+    
+    The rubric is built once and the same object is returned on every
+    call; don't mutate it (use copy.deepcopy for a private copy).
     """
     return RubricData(
         name="AI-Assisted Writing Assignment Rubric",
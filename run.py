@@ -8,30 +8,37 @@ Or with uvicorn directly:
     uvicorn app.api.main:app --reload
 """
 
+import sys
+
 import uvicorn
 from app.config import get_settings
 
-settings = get_settings()
-
 
 def main():
     """Start the FastAPI server."""
-    print("""
+    settings = get_settings()
+    
+    sys.stdout.write(f"""
 ============================================================
                PROCESS ANALYZER
       AI-Assisted Writing Process Analyzer
-============================================================""")
-    print(f"  Starting server at: http://{settings.host}:{settings.port}")
-    print(f"  API Docs at: http://{settings.host}:{settings.port}/docs")
-    print(f"  Debug mode: {settings.debug}")
-    print("============================================================\n")
+============================================================
+  Starting server at: http://{settings.host}:{settings.port}
+  API Docs at: http://{settings.host}:{settings.port}/docs
+  Debug mode: {settings.debug}
+============================================================
+
+""")
+    sys.stdout.flush()
+    
+    # reload and workers are mutually exclusive in uvicorn
+    kwargs = {"host": settings.host, "port": settings.port}
+    if settings.reload:
+        kwargs["reload"] = True
+    else:
+        kwargs["workers"] = max(1, settings.workers)
     
-    uvicorn.run(
-        "app.api.main:app",
-        host=settings.host,
-        port=settings.port,
-        reload=settings.reload,
-    )
+    uvicorn.run("app.api.main:app", **kwargs)
 
 
 if __name__ == "__main__":
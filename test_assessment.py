@@ -7,14 +7,21 @@ This script demonstrates the complete assessment workflow:
 3. Assess each criterion with RAG retrieval
 4. Generate summary
 5. Run authenticity check
+
+Error-free results are cached in .cache/ keyed by a hash of all
+assessment inputs, so re-running with unchanged inputs skips the LLM
+calls. Pass --fresh to force a new assessment, and --fused to score every criterion (and
+authenticity) in a single generation instead of one call per criterion.
 """
 
 import asyncio
+import hashlib
 import sys
-import json
 from pathlib import Path
 from datetime import datetime
 
+import orjson
+
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent))
 
@@ -28,7 +35,8 @@ async def main():
     # Import modules
     from app.services.parsing import parse_chat_history, parse_essay
     from app.services.rubric import create_default_rubric
-    from app.services.assessment import assess_submission
+    from app.services.assessment import FullAssessment, assess_submission
+    from app.services.ollama import close_shared_client
     from app.config import get_settings
     
     settings = get_settings()
@@ -43,14 +51,16 @@ async def main():
         print("ERROR: Sample files not found!")
         return
     
-    # The essay is embedded in the Sample 1.md file
-    essay_content = essay_path.read_text(encoding="utf-8")
+    # The essay is embedded in the Sample 1.md file; both files are read
+    # concurrently in worker threads so the event loop is not blocked
+    essay_content, chat_content = await asyncio.gather(
+        asyncio.to_thread(essay_path.read_text, encoding="utf-8"),
+        asyncio.to_thread(chat_path.read_text, encoding="utf-8"),
+    )
     
     # Extract just the essay part (it's after "Essay" heading)
     essay_text = """I think that companies that develop AI will continue to hide information about there developments and agenda for their systems. These companies are driven by one thing...power. Whether it be money, control, influence, or image people are greedy as long as people are in control they will tailor there systems to bring nothing but rewards back to them. No matter what rules or laws are put in place they will dodge these loopholes just like the rich do in taxes to get themselves closer to more gain. People can believe in ethics and the common but what people say and do are two different things especially when it comes to people in power...the people who control the development of their systems. Even if we put people in line to check them whos to say they aren't bought or paid off like other government official who already are. There is so much room for error and advantage i do not think its possible for it to stay ethical. The big reason why AI won't take over the world is because these companies need a world to take advantage of so they will make sure it develops to only help them. Maybe at some point it might go far but I won't wipe us out in a Terminator or Age of Ultron manor."""
     
-    chat_content = chat_path.read_text(encoding="utf-8")
-    
     print(f"  Essay length: {len(essay_text)} characters")
     print(f"  Chat history: {len(chat_content)} characters")
     
@@ -96,23 +106,51 @@ Requirements:
     model = "ministral-3:latest"  # Faster for testing
     # model = settings.default_analysis_model  # Full quality
     
+    # One generation for all criteria, or one per criterion
+    fused = "--fused" in sys.argv
+    
     print(f"\nUsing model: {model}")
+    print(f"Mode: {'fused (one call for all criteria)' if fused else 'per-criterion'}")
     print("\n" + "=" * 70)
     print("Starting Assessment (this may take several minutes)...")
     print("=" * 70 + "\n")
     
+    # Cache key covers every input that affects the assessment
+    cache_key = hashlib.sha256(b"\0".join([
+        essay_text.encode("utf-8"),
+        chat_content.encode("utf-8"),
+        rubric.to_json_bytes(),
+        assignment_context.encode("utf-8"),
+        model.encode("utf-8"),
+        b"authenticity=conservative",
+        b"fused" if fused else b"per-criterion",
+    ])).hexdigest()
+    cache_path = Path(".cache") / f"assess_{cache_key}.json"
+    
     start_time = datetime.now()
     
     try:
-        result = await assess_submission(
-            chat_history=chat_history,
-            essay=essay,
-            rubric=rubric,
-            assignment_context=assignment_context,
-            model=model,
-            run_authenticity=True,
-            authenticity_mode="conservative",
-        )
+        if cache_path.exists() and "--fresh" not in sys.argv:
+            print(f"Using cached result: {cache_path} (pass --fresh to re-run)")
+            result = FullAssessment.from_dict(
+                orjson.loads(cache_path.read_bytes())
+            )
+        else:
+            result = await assess_submission(
+                chat_history=chat_history,
+                essay=essay,
+                rubric=rubric,
+                assignment_context=assignment_context,
+                model=model,
+                run_authenticity=True,
+                authenticity_mode="conservative",
+                fused=fused,
+            )
+            # Runs with errors (timeouts, failed embedding) are not cached,
+            # so the next run retries them instead of replaying the failure
+            if not result.errors:
+                cache_path.parent.mkdir(exist_ok=True)
+                cache_path.write_bytes(orjson.dumps(result.to_dict()))
         
         end_time = datetime.now()
         duration = (end_time - start_time).total_seconds()
@@ -173,8 +211,7 @@ Requirements:
         
         # Save full results to file
         output_path = Path("test_assessment_result.json")
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(result.to_dict(), f, indent=2)
+        output_path.write_bytes(orjson.dumps(result.to_dict(), option=orjson.OPT_INDENT_2))
         print(f"\n  Full results saved to: {output_path}")
         
     except Exception as e:
@@ -182,12 +219,24 @@ Requirements:
         print(f"  {type(e).__name__}: {e}")
         import traceback
         traceback.print_exc()
+    finally:
+        # All Ollama calls shared one connection pool; close it before the
+        # event loop goes away
+        await close_shared_client()
     
     print("\n" + "=" * 70)
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    # uvloop ships with uvicorn[standard] on Linux and macOS
+    try:
+        import uvloop
+        loop_factory = uvloop.new_event_loop
+    except ImportError:
+        loop_factory = None
+    
+    with asyncio.Runner(loop_factory=loop_factory) as runner:
+        runner.run(main())
 
 
 
@@ -141,11 +141,76 @@ AI: Sure! A common example is virtual assistants like Siri or Alexa, which use A
     return True
 
 
+def test_markdown_parsing():
+    """Test markdown stripping on a sample with bold-labelled bullets."""
+    print("\nTesting markdown parsing...")
+    
+    import re
+    from app.services.parsing import parse_essay
+    
+    sample_path = Path("RubricDocs/sample copy paste gpt.md")
+    if not sample_path.exists():
+        print(f"  [SKIP] {sample_path} not found")
+        return True
+    
+    content = sample_path.read_bytes()
+    result = parse_essay(content, sample_path.name)
+    output_lines = {line.strip() for line in result.text.split("\n")}
+    
+    # Each "* **Label:** text" bullet should become "* Label: text"
+    bullets = re.findall(r"^\s*\* \*\*(.+?)\*\*(.*?)\s*$", content.decode("utf-8"), re.MULTILINE)
+    broken = [
+        label for label, rest in bullets
+        if " ".join(f"* {label}{rest}".split()) not in output_lines
+    ]
+    
+    print(f"  Bold-labelled bullets: {len(bullets)}")
+    if broken:
+        print(f"  [FAIL] Bullets mangled: {', '.join(broken)}")
+        return False
+    
+    print("  [OK] Markdown bullets keep their labels")
+    return True
+
+
+def test_embedding_quantization():
+    """Test that int8 embeddings reproduce float dot products."""
+    print("\nTesting embedding quantization...")
+    
+    import numpy as np
+    from app.services.ollama import quantize_int8
+    
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((8, 768)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    
+    q, scale = quantize_int8(vectors)
+    
+    # Widen before the matmul, as the quantize_int8 docstring describes
+    approx = (q.astype(np.int32) @ q.T.astype(np.int32)) * np.outer(scale, scale)
+    error = float(np.abs(approx - vectors @ vectors.T).max())
+    
+    print(f"  Max dot product error: {error:.4f}")
+    if q.dtype != np.int8 or error > 0.01:
+        print("  [FAIL] Quantized dot products drift from float32")
+        return False
+    
+    print("  [OK] int8 dot products match float32")
+    return True
+
+
 async def test_ollama():
     """Test Ollama connectivity."""
     print("\nTesting Ollama connection...")
     
-    from app.services.ollama import check_ollama_connection, list_available_models
+    from app.services.ollama import (
+        check_ollama_connection,
+        list_available_models,
+        wait_for_model_warmup,
+    )
+    from app.config import get_settings
+    
+    settings = get_settings()
     
     status = await check_ollama_connection()
     
@@ -160,6 +225,13 @@ async def test_ollama():
             print(f"    - {model.name} ({model.size_human})")
         if len(models) > 10:
             print(f"    ... and {len(models) - 10} more")
+        
+        # The connection check started loading the default models in the
+        # background; let it finish so the first assessment starts hot
+        if settings.ollama_warmup_on_connect:
+            print(f"\n  Loading {settings.default_analysis_model} and {settings.default_embedding_model}...")
+            await wait_for_model_warmup()
+            print("  [OK] Model warmup finished")
     else:
         print(f"  [WARN] Not connected: {status.get('message')}")
         print("  (This is okay if Ollama isn't running yet)")
@@ -207,6 +279,12 @@ async def main():
     if not test_chat_parsing():
         all_passed = False
     
+    if not test_markdown_parsing():
+        all_passed = False
+    
+    if not test_embedding_quantization():
+        all_passed = False
+    
     # Async tests
     if not await test_database():
         all_passed = False
@@ -228,4 +306,12 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    # uvloop ships with uvicorn[standard] on Linux and macOS
+    try:
+        import uvloop
+        loop_factory = uvloop.new_event_loop
+    except ImportError:
+        loop_factory = None
+    
+    with asyncio.Runner(loop_factory=loop_factory) as runner:
+        runner.run(main())